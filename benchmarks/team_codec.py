@@ -0,0 +1,106 @@
+"""Compare the size and speed of the team group payload codecs.
+
+Run with `python -m benchmarks.team_codec` from the repository root.
+"""
+
+import json
+import zlib
+from datetime import UTC, datetime
+from timeit import timeit
+from typing import Any
+
+from src._emojis import LukEmojis
+from src.embeds.team._group_codec import decode_group_data, encode_group_data
+
+_ROUNDS = 5_000
+
+
+def _member(member_id: int, emoji: str, **extra: int | bool) -> dict[str, Any]:
+    return {
+        "id": member_id,
+        "role": emoji,
+        "help": False,
+        "airona": None,
+        "tina": None,
+        "basilisk": None,
+        **extra,
+    }
+
+
+def _encode_json(data: dict[str, Any]) -> bytes:
+    # The pydantic JSON that version 1 payloads held.
+    return zlib.compress(
+        json.dumps(data, default=datetime.isoformat, separators=(",", ":")).encode(),
+        level=9,
+    )
+
+
+def _sample() -> dict[str, Any]:
+    return {
+        "name": "Weekly raid - hard mode clear",
+        "time": datetime(2026, 1, 2, 20, 0, tzinfo=UTC),
+        "desc": "Bring food and potions. Voice chat is optional.",
+        "roles": ["dps", "healer", "tank"],
+        "limits": [3.0, 1.0, float("inf")],
+        "members": [
+            [
+                _member(412345678901234567, str(LukEmojis.sb), airona=3),
+                _member(412345678901234568, str(LukEmojis.fm), tina=5, basilisk=1),
+                _member(412345678901234569, str(LukEmojis.mm)),
+                _member(412345678901234570, str(LukEmojis.wk), help=True),
+            ],
+            [
+                _member(412345678901234571, str(LukEmojis.vo), tina=2),
+                _member(412345678901234572, str(LukEmojis.bp)),
+            ],
+            [_member(412345678901234573, str(LukEmojis.sk), airona=0)],
+        ],
+        "waitlists": [[_member(412345678901234574, str(LukEmojis.hg))], [], []],
+        "owner": {
+            "id": 312345678901234567,
+            "name": "raid.leader",
+            "icon_url": (
+                "https://cdn.discordapp.com/avatars/312345678901234567/"
+                "a_0123456789abcdef0123456789abcdef.png?size=1024"
+            ),
+        },
+    }
+
+
+def main() -> None:
+    data = _sample()
+
+    legacy = _encode_json(data)
+    compact = encode_group_data(data)
+
+    assert decode_group_data(compact) == data  # noqa: S101
+    # Roles come from the payload, not from a fixed list.
+    reordered = data | {
+        role: [data[role][2], data[role][0]]
+        for role in ("roles", "limits", "members", "waitlists")
+    }
+    assert decode_group_data(encode_group_data(reordered)) == reordered  # noqa: S101
+    fractional = data | {"limits": [2.5, 1.0, float("inf")]}
+    assert decode_group_data(encode_group_data(fractional)) == fractional  # noqa: S101
+
+    legacy_encode = timeit(lambda: _encode_json(data), number=_ROUNDS)
+    compact_encode = timeit(lambda: encode_group_data(data), number=_ROUNDS)
+    legacy_decode = timeit(lambda: json.loads(zlib.decompress(legacy)), number=_ROUNDS)
+    compact_decode = timeit(lambda: decode_group_data(compact), number=_ROUNDS)
+
+    # Payloads end up base64 encoded in the URL.
+    legacy_size = len(legacy) * 4 // 3
+    print(f"{'codec':<10}{'size':>8}{'encode':>12}{'decode':>12}")  # noqa: T201
+    for name, size, encode, decode in (
+        ("v1 json", legacy_size, legacy_encode, legacy_decode),
+        ("v2 binary", len(compact), compact_encode, compact_decode),
+    ):
+        print(  # noqa: T201
+            f"{name:<10}{size:>7}B"
+            f"{encode / _ROUNDS * 1e6:>10.1f}us"
+            f"{decode / _ROUNDS * 1e6:>10.1f}us",
+        )
+
+
+if __name__ == "__main__":
+    main()
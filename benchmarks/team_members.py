@@ -0,0 +1,77 @@
+"""Time member changes of team groups as they grow.
+
+The help toggle of a waitlisted member is checked first, since it moves
+members between the waitlist and the role.
+
+Run with `python -m benchmarks.team_members` from the repository root.
+"""
+
+from datetime import UTC, datetime
+from timeit import timeit
+from typing import cast
+
+from discord import Member, Object
+
+from src._emojis import LukEmojis
+from src.embeds.team.group_controller import GroupEmbedController, _GroupOwner
+
+_ROUNDS = 2_000
+_SIZES = (10, 100, 1_000)
+
+
+def _member(member_id: int) -> Member:
+    return cast("Member", Object(member_id))
+
+
+def _group(size: int) -> GroupEmbedController:
+    controller = GroupEmbedController(
+        name="Benchmark",
+        time=datetime(2026, 1, 2, 20, 0, tzinfo=UTC),
+        desc=None,
+        limits=(size, 1, 1),
+        owner=_GroupOwner(id=1, name="owner", icon_url=""),
+    )
+    for member_id in range(size):
+        controller.add_member(_member(member_id), "dps", LukEmojis.sb)
+    return controller
+
+
+def _leave_and_rejoin(size: int) -> float:
+    controller = _group(size)
+    member = _member(size // 2)
+
+    def run() -> None:
+        controller.remove_member(member)
+        controller.add_member(member, "dps", LukEmojis.fm)
+
+    return timeit(run, number=_ROUNDS) / _ROUNDS * 1e6
+
+
+def _check_help_toggle() -> None:
+    # One tank slot: the second tank waits, helps, then stops helping.
+    controller = _group(0)
+    tank, waiter = _member(1), _member(2)
+    controller.add_member(tank, "tank", LukEmojis.sb)
+    controller.add_member(waiter, "tank", LukEmojis.sb)
+    assert controller.is_waiting(waiter)  # noqa: S101
+
+    assert controller.toggle_help(waiter) is True  # noqa: S101
+    assert not controller.is_waiting(waiter)  # noqa: S101
+
+    # The role is still full, so they go back to the waitlist.
+    assert controller.toggle_help(waiter) is False  # noqa: S101
+    assert controller.is_waiting(waiter)  # noqa: S101
+
+    controller.remove_member(tank)
+    assert not controller.is_waiting(waiter)  # noqa: S101
+
+
+def main() -> None:
+    _check_help_toggle()
+    print(f"{'members':>8}{'leave + rejoin':>18}")  # noqa: T201
+    for size in _SIZES:
+        print(f"{size:>8}{_leave_and_rejoin(size):>16.1f}us")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Check and time the team group time parser against plain dateutil.
+
+Run with `python -m benchmarks.time_parser` from the repository root.
+"""
+
+from datetime import UTC, date, datetime, time, timedelta, timezone
+from timeit import timeit
+
+from dateutil.parser import parse
+
+from src._constants import TIMEZONES
+from src._time import (
+    _parse_fallback,  # pyright: ignore[reportPrivateUsage]
+    _parse_fast,  # pyright: ignore[reportPrivateUsage]
+    format_time,
+    parse_time,
+)
+from src._utils import datetime_now
+
+_ROUNDS = 2_000
+
+# Inputs seen in team modals. The fast path must agree with dateutil on all
+# of them.
+_ABSOLUTE = (
+    "2026-12-31 20:00 BRT",
+    "2026-01-05 09:30 UTC",
+    "2026-3-7 8:00 EST",
+    "2026-07-04T21:15 JST",
+    "2026-11-02 19:00",
+    "Dec 31 8pm EST",
+    "Dec 31 8:30pm PST",
+    "December 31st 20:30 CET",
+    "jan 2 9am",
+    "Sept 14 11:45 PM KST",
+    "Mar 3, 7pm AEST",
+    # Not in a documented format, dateutil reads these.
+    "12/31 20:00 EST",
+    "31 Dec 2026 20:00 BRT",
+    "tomorrow 20:00",
+)
+
+# Inputs dateutil gets wrong.
+_EXPECTED = {
+    "2026-07-04 21:15 CST(China)": datetime(
+        2026,
+        7,
+        4,
+        21,
+        15,
+        tzinfo=TIMEZONES["CST(China)"],
+    ),
+}
+
+_RELATIVE = {
+    "in 2h": timedelta(hours=2),
+    "in 90m": timedelta(minutes=90),
+    "in 1h 30m": timedelta(hours=1, minutes=30),
+    "In 3 days": timedelta(days=3),
+    "in 1w": timedelta(weeks=1),
+}
+
+
+# Times the modals are filled with, which must read back unchanged.
+_FORMATTED = (
+    datetime(2026, 12, 31, 20, 0, tzinfo=timezone(timedelta(hours=-3))),
+    datetime(2026, 7, 4, 21, 15, tzinfo=timezone(timedelta(hours=5, minutes=30))),
+    datetime(2026, 7, 4, 21, 15, tzinfo=TIMEZONES["EST"]),
+    datetime(2026, 1, 5, 9, 30, tzinfo=UTC),
+    datetime(2026, 11, 2, 19, 0),  # noqa: DTZ001
+)
+
+
+def _dateutil(text: str) -> datetime:
+    default = datetime.combine(date.today(), time())  # noqa: DTZ011
+    return parse(text, tzinfos=TIMEZONES, default=default)
+
+
+def _check() -> None:
+    for text in _ABSOLUTE:
+        try:
+            expected = _dateutil(text)
+        except ValueError:
+            # Neither parser may read what dateutil cannot.
+            try:
+                parse_time(text)
+            except ValueError:
+                continue
+            msg = f"{text!r} parsed, dateutil refuses it"
+            raise AssertionError(msg) from None
+
+        if (result := parse_time(text)) != expected or result.tzinfo != (
+            expected.tzinfo
+        ):
+            msg = f"{text!r}: {result!r} != {expected!r}"
+            raise AssertionError(msg)
+
+    for text, expected in _EXPECTED.items():
+        if (result := parse_time(text)) != expected:
+            msg = f"{text!r}: {result!r} != {expected!r}"
+            raise AssertionError(msg)
+
+    for text, delta in _RELATIVE.items():
+        offset = parse_time(text) - datetime_now() - delta
+        if abs(offset) > timedelta(seconds=1):
+            msg = f"{text!r} is off by {offset}"
+            raise AssertionError(msg)
+
+
+def _check_formatted() -> None:
+    for value in _FORMATTED:
+        if (result := parse_time(text := format_time(value))) != value:
+            msg = f"{value!r} formats as {text!r}, which reads as {result!r}"
+            raise AssertionError(msg)
+
+
+def _per_parse(statement: str, setup: str = "pass") -> float:
+    inputs = (*_ABSOLUTE, *_EXPECTED, *_RELATIVE)
+    seconds = timeit(
+        f"for text in inputs:\n    {setup}\n    {statement}",
+        globals={
+            "inputs": inputs,
+            "parse_time": parse_time,
+            "_dateutil": _dateutil,
+            "_parse_fast": _parse_fast,
+            "_parse_fallback": _parse_fallback,
+        },
+        number=_ROUNDS,
+    )
+    return seconds / (_ROUNDS * len(inputs)) * 1e6
+
+
+def _safe(call: str) -> str:
+    return f"try: {call}\n    except ValueError: pass"
+
+
+def main() -> None:
+    _check()
+    _check_formatted()
+    count = len(_ABSOLUTE) + len(_EXPECTED) + len(_RELATIVE) + len(_FORMATTED)
+    print(f"correct on {count} inputs")  # noqa: T201
+
+    rows = (
+        ("dateutil", _per_parse(_safe("_dateutil(text)"))),
+        (
+            "parse_time, cold",
+            _per_parse(
+                _safe("parse_time(text)"),
+                setup="_parse_fast.cache_clear(); _parse_fallback.cache_clear()",
+            ),
+        ),
+        ("parse_time, memoized", _per_parse(_safe("parse_time(text)"))),
+    )
+
+    print(f"{'parser':<24}{'per parse':>12}")  # noqa: T201
+    for name, micros in rows:
+        print(f"{name:<24}{micros:>10.1f}us")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
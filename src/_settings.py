@@ -19,8 +19,24 @@ class _Settings(BaseSettings):
 
     MONGO_URI: str
     MONGO_DB_NAME: str = "luk-chan"
+    # Explains each new query shape once and warns about collection scans.
+    MONGO_EXPLAIN_QUERIES: bool = True
 
     MIN_MESSAGE_LENGTH: int = 5
 
+    LEADERBOARD_FLUSH_SIZE: int = 500
+    LEADERBOARD_FLUSH_INTERVAL: float = 10.0
+    LEADERBOARD_RANK_INTERVAL: float = 30.0
+    LEADERBOARD_RANK_INDEX: bool = True
+    LEADERBOARD_BACKFILL_CONCURRENCY: int = 4
+    LEADERBOARD_BACKFILL_BATCH_SIZE: int = 1000
+    LEADERBOARD_TOP_CACHE_TTL: float = 30.0
+
+    TEAM_EDIT_WINDOW: float = 1.0
+    TEAM_REMINDER_GRACE: float = 900.0
+    TEAM_CLOSE_GRACE: float = 6 * 60 * 60
+    TEAM_SWEEP_INTERVAL: float = 10 * 60
+    TEAM_SWEEP_BATCH_SIZE: int = 10
+
 
 config = _Settings()  # pyright: ignore[reportCallIssue]
@@ -0,0 +1,143 @@
+from collections.abc import Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+
+from discord import PartialEmoji
+
+from src._constants import PRESETS, TeamPreset
+from src._emojis import LukEmojis
+
+
+@dataclass(frozen=True, slots=True)
+class TeamRole:
+    # Stored with groups and used in queries, never change it.
+    key: str
+    # Written in the fields input of the team modals, e.g. "DPS:3".
+    alias: str
+    label: str
+    emoji: PartialEmoji
+
+
+ROLES = MappingProxyType(
+    {
+        role.key: role
+        for role in (
+            TeamRole("dps", "DPS", "Damage", LukEmojis.dps),
+            TeamRole("healer", "Sup", "Support", LukEmojis.sup),
+            TeamRole("tank", "Tank", "Tank", LukEmojis.tank),
+        )
+    },
+)
+_ROLES_BY_ALIAS = MappingProxyType(
+    {role.alias.lower(): role for role in ROLES.values()},
+)
+
+
+@dataclass(frozen=True, slots=True)
+class TeamSchema:
+    """The roles of a group, in field order, and their default limits."""
+
+    roles: tuple[TeamRole, ...]
+    default_limits: tuple[float, ...]
+    # Role key and lowercase alias to the index of the role.
+    indexes: MappingProxyType[str, int]
+    aliases: MappingProxyType[str, int]
+
+    @classmethod
+    def compile(
+        cls,
+        roles: Sequence[TeamRole],
+        default_limits: Sequence[float],
+    ) -> "TeamSchema":
+        return cls(
+            roles=tuple(roles),
+            default_limits=tuple(default_limits),
+            indexes=MappingProxyType({role.key: i for i, role in enumerate(roles)}),
+            aliases=MappingProxyType(
+                {role.alias.lower(): i for i, role in enumerate(roles)},
+            ),
+        )
+
+    @property
+    def keys(self) -> tuple[str, ...]:
+        return tuple(role.key for role in self.roles)
+
+    def parse_limits(self, text: str) -> tuple[float, ...]:
+        """Parse a fields input such as "DPS:3 Sup:1 Tank".
+
+        A role without a count has no limit, roles that are not written keep
+        their default, and unknown roles are ignored. Parsing stops at the
+        first count that is not a number.
+
+        Args:
+            text (str): The fields input.
+
+        Returns:
+            tuple[float, ...]: The limit of every role, in field order.
+        """
+        limits = list(self.default_limits)
+
+        for part in text.split():
+            alias, *count = part.split(":")
+            try:
+                limit = float(count[0]) if len(count) == 1 else float("inf")
+            except ValueError:
+                break
+
+            if (index := self.aliases.get(alias.lower())) is not None:
+                limits[index] = limit
+
+        return tuple(limits)
+
+    def format_limits(self, limits: Sequence[float]) -> str:
+        """Write limits the way `parse_limits` reads them.
+
+        Args:
+            limits (Sequence[float]): The limit of every role, in field order.
+
+        Returns:
+            str: The fields input.
+        """
+        parts: list[str] = []
+        for role, limit in zip(self.roles, limits, strict=True):
+            if limit == float("inf"):
+                parts.append(role.alias)
+            elif float(limit).is_integer():
+                parts.append(f"{role.alias}:{int(limit)}")
+            else:
+                parts.append(f"{role.alias}:{limit}")
+
+        return " ".join(parts)
+
+
+SCHEMAS = MappingProxyType(
+    {
+        preset: TeamSchema.compile(
+            [_ROLES_BY_ALIAS[field["name"].lower()] for field in fields],
+            [field["default_limit"] for field in fields],
+        )
+        for preset, fields in PRESETS.items()
+    },
+)
+DEFAULT_SCHEMA = SCHEMAS[TeamPreset.BPSR5]
+
+
+@lru_cache(maxsize=16)
+def schema_for(keys: tuple[str, ...]) -> TeamSchema:
+    """Get the schema of a group from the keys of its roles.
+
+    Groups keep the defaults of the first preset with the same roles, or
+    have no limits by default if no preset matches.
+
+    Raises:
+        KeyError: If a role key is unknown.
+    """
+    for schema in SCHEMAS.values():
+        if schema.keys == keys:
+            return schema
+
+    return TeamSchema.compile(
+        [ROLES[key] for key in keys],
+        [float("inf")] * len(keys),
+    )
@@ -0,0 +1,205 @@
+import re
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from functools import lru_cache
+from typing import NamedTuple
+
+from dateutil.parser import parse
+
+from src._constants import TIMEZONES
+from src._utils import datetime_now
+
+# "2024-12-31 20:00 BRT" or "2024-12-31 20:00 -0300", the format the team
+# modals are filled with.
+_DATE_TIME = re.compile(
+    r"(\d{4})-(\d{1,2})-(\d{1,2})[ T](\d{1,2}):(\d{2})(?: (\S+))?",
+)
+# Month names, e.g. "Dec 31 8pm EST" or "December 31st 20:30 EST".
+_MONTH_DAY_TIME = re.compile(
+    r"([A-Za-z]+)\.? (\d{1,2})(?:st|nd|rd|th)?,? "
+    r"(\d{1,2})(?::(\d{2}))? ?([AaPp][Mm])?(?: (\S+))?",
+)
+# Offsets from now, e.g. "in 2h", "in 1h 30m" or "in 3 days".
+_RELATIVE_TIME = re.compile(r"in ((?:\d+ ?[A-Za-z]+ ?)+)", re.IGNORECASE)
+_RELATIVE_PART = re.compile(r"(\d+) ?([A-Za-z]+)")
+# Numeric offsets as `%z` writes them, e.g. "-0300" or "+05:30".
+_OFFSET = re.compile(r"([+-])(\d{2}):?(\d{2})")
+
+_MONTHS = {
+    name: number
+    for number, names in enumerate(
+        (
+            ("jan", "january"),
+            ("feb", "february"),
+            ("mar", "march"),
+            ("apr", "april"),
+            ("may",),
+            ("jun", "june"),
+            ("jul", "july"),
+            ("aug", "august"),
+            ("sep", "sept", "september"),
+            ("oct", "october"),
+            ("nov", "november"),
+            ("dec", "december"),
+        ),
+        start=1,
+    )
+    for name in names
+}
+_UNITS = {
+    **dict.fromkeys(("m", "min", "mins", "minute", "minutes"), "minutes"),
+    **dict.fromkeys(("h", "hr", "hrs", "hour", "hours"), "hours"),
+    **dict.fromkeys(("d", "day", "days"), "days"),
+    **dict.fromkeys(("w", "week", "weeks"), "weeks"),
+}
+_NOON = 12
+# Zones back to their name, the first one for zones with several names.
+_TIMEZONE_NAMES = {tz: name for name, tz in reversed(TIMEZONES.items())}
+
+
+class _Absolute(NamedTuple):
+    # None is the current year.
+    year: int | None
+    month: int
+    day: int
+    hour: int
+    minute: int
+    tz: tzinfo | None
+
+
+def _timezone(name: str | None) -> tzinfo | None:
+    if name is None:
+        return None
+    if match := _OFFSET.fullmatch(name):
+        sign, hours, minutes = match.groups()
+        offset = timedelta(hours=int(hours), minutes=int(minutes))
+        return timezone(-offset if sign == "-" else offset)
+    return TIMEZONES[name]
+
+
+def _parse_date_time(text: str) -> _Absolute | None:
+    if not (match := _DATE_TIME.fullmatch(text)):
+        return None
+
+    year, month, day, hour, minute, tz = match.groups()
+    return _Absolute(
+        int(year),
+        int(month),
+        int(day),
+        int(hour),
+        int(minute),
+        _timezone(tz),
+    )
+
+
+def _parse_month_day_time(text: str) -> _Absolute | None:
+    if not (match := _MONTH_DAY_TIME.fullmatch(text)):
+        return None
+
+    name, day, hour, minute, meridiem, tz = match.groups()
+    if minute is None and meridiem is None:
+        # "Dec 31 20" is too ambiguous to guess here.
+        return None
+
+    hour = int(hour)
+    if meridiem is not None:
+        if not 1 <= hour <= _NOON:
+            return None
+        hour = hour % _NOON + (_NOON if meridiem.lower() == "pm" else 0)
+
+    return _Absolute(
+        None,
+        _MONTHS[name.lower()],
+        int(day),
+        hour,
+        int(minute or 0),
+        _timezone(tz),
+    )
+
+
+def _parse_relative(text: str) -> timedelta | None:
+    if not (match := _RELATIVE_TIME.fullmatch(text)):
+        return None
+
+    delta = timedelta()
+    for amount, unit in _RELATIVE_PART.findall(match[1]):
+        delta += timedelta(**{_UNITS[unit.lower()]: int(amount)})
+    return delta
+
+
+@lru_cache(maxsize=256)
+def _parse_fast(text: str) -> _Absolute | timedelta | None:
+    """Parse the documented formats, None for anything else."""
+    try:
+        return (
+            _parse_date_time(text)
+            or _parse_month_day_time(text)
+            or _parse_relative(text)
+        )
+    except KeyError:
+        # An unknown month, unit or timezone.
+        return None
+
+
+@lru_cache(maxsize=256)
+def _parse_fallback(text: str, today: date) -> datetime:
+    # dateutil fills in what the text leaves out from today.
+    return parse(text, tzinfos=TIMEZONES, default=datetime.combine(today, time()))
+
+
+def parse_time(text: str) -> datetime:
+    """Parse the time of a team group.
+
+    "2024-12-31 20:00 BRT", "2024-12-31 20:00 -0300", "Dec 31 8pm EST" and
+    "in 2h" are read by a fast path, anything else by dateutil. Recent inputs
+    are memoized.
+
+    Args:
+        text (str): The time as written by the user.
+
+    Returns:
+        datetime: The time, naive if the text has no timezone.
+
+    Raises:
+        ValueError: If the text is not a valid time.
+    """
+    text = " ".join(text.split())
+
+    match _parse_fast(text):
+        case timedelta() as delta:
+            return datetime_now() + delta
+        case _Absolute() as absolute:
+            return datetime(
+                absolute.year or date.today().year,  # noqa: DTZ011
+                absolute.month,
+                absolute.day,
+                absolute.hour,
+                absolute.minute,
+                tzinfo=absolute.tz,
+            )
+        case None:
+            return _parse_fallback(text, date.today())  # noqa: DTZ011
+
+
+def format_time(value: datetime) -> str:
+    """Format a time the way the team modals show it.
+
+    Args:
+        value (datetime): The time to format.
+
+    Returns:
+        str: The time, to the minute, in a format `parse_time` reads fast.
+    """
+    # Equal instants in other timezones format differently.
+    return _format_minute(value.replace(second=0, microsecond=0), value.tzinfo)
+
+
+@lru_cache(maxsize=256)
+def _format_minute(value: datetime, _tz: object) -> str:
+    if value.tzinfo is None:
+        return value.strftime("%Y-%m-%d %H:%M")
+
+    # Abbreviations such as "EDT" or "UTC-03:00" are not names `parse_time`
+    # knows, so other zones are written as their offset.
+    if (name := _TIMEZONE_NAMES.get(value.tzinfo)) is None:
+        name = "UTC" if value.utcoffset() == timedelta() else value.strftime("%z")
+    return f"{value:%Y-%m-%d %H:%M} {name}"
@@ -1,3 +1,4 @@
+from collections.abc import Iterable
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
@@ -52,3 +53,43 @@ def datetime_to_relative_past_string(dt: datetime) -> str:
             return f"{value} {name}{'s' if value > 1 else ''} ago"
 
     return "just now"
+
+
+def chunk_lines(lines: Iterable[str], limit: int) -> list[str]:
+    """Join lines into as few chunks of at most `limit` characters as possible.
+
+    Lines are joined by newlines and kept whole, unless a single line is
+    longer than `limit`, in which case it is split across chunks.
+
+    Args:
+        lines (Iterable[str]): The lines to join, in order.
+        limit (int): The maximum length of a chunk.
+
+    Returns:
+        list[str]: The chunks, empty if there were no lines.
+    """
+    chunks: list[str] = []
+    current: list[str] = []
+    # Length of the current chunk, counting the newline before each line.
+    size = -1
+
+    for line in lines:
+        length = len(line)
+
+        if size + 1 + length > limit and current:
+            chunks.append("\n".join(current))
+            current = []
+            size = -1
+
+        while length > limit:
+            chunks.append(line[:limit])
+            line = line[limit:]  # noqa: PLW2901
+            length -= limit
+
+        current.append(line)
+        size += 1 + length
+
+    if current:
+        chunks.append("\n".join(current))
+
+    return chunks
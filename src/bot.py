@@ -33,5 +33,9 @@ class LukChan(commands.Bot):
 
         await load_cogs(self)
 
+    async def close(self) -> None:
+        await super().close()
+        await Database.disconnect()
+
     def init(self) -> None:
         self.run(token=config.TOKEN)
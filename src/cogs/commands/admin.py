@@ -1,12 +1,12 @@
-import json
-from io import BytesIO
+from logging import getLogger
 
-from discord import File, Interaction, Message, Permissions, TextChannel, app_commands
+from discord import HTTPException, Interaction, Message, Permissions, app_commands
 from discord.ext import commands
 
-from src._settings import config
 from src.components.admin.check_reactions import CheckReactionsView
-from src.db.leaderboard import LeaderboardDatabase
+from src.services.leaderboard import BackfillProgress, LeaderboardBackfill
+
+_logger = getLogger("luk.leaderboard.backfill")
 
 
 class AdminCog(commands.Cog):
@@ -19,7 +19,7 @@ class AdminCog(commands.Cog):
 
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
-        self._leadeboard_db = LeaderboardDatabase()
+        self._backfill = LeaderboardBackfill()
 
         self.check_role_ctx = app_commands.ContextMenu(
             name="Roll call",
@@ -58,42 +58,28 @@ class AdminCog(commands.Cog):
             )
             return
 
-        table: dict[int, dict[int, int]] = {}
-
-        for channel in await guild.fetch_channels():
-            if isinstance(channel, (TextChannel)):
-                table[channel.id] = {}
-
-                async for message in channel.history(limit=None):
-                    if message.author.bot or (
-                        not message.content
-                        or message.content.isspace()
-                        or message.content.startswith(("!", "/", "?"))
-                        or len(message.content) < config.MIN_MESSAGE_LENGTH
-                    ):
-                        continue
-
-                    await self._leadeboard_db.update_user(
-                        user_id=str(message.author.id),
-                        message=message.content.strip(),
-                    )
-                    if message.author.id not in table[channel.id]:
-                        table[channel.id][message.author.id] = 0
-
-                    table[channel.id][message.author.id] += 1
-
-        await interaction.followup.send(
-            content=(
-                "Leaderboard synced successfully.\n\n"
-                f"Channels synced: {len(table)}\n"
-                f"Users synced: {sum(len(users) for users in table.values())}"
-            ),
-            ephemeral=True,
-            file=File(
-                BytesIO(json.dumps(table, indent=4).encode()),
-                filename="leaderboard.json",
-            ),
-        )
+        if self._backfill.running:
+            await interaction.edit_original_response(
+                content="A leaderboard sync is already running.",
+            )
+            return
+
+        async def report(progress: BackfillProgress) -> None:
+            await interaction.edit_original_response(
+                content=f"Syncing leaderboard...\n\n{progress.summary()}",
+            )
+
+        progress = await self._backfill.run(guild, report)
+
+        try:
+            await interaction.edit_original_response(
+                content=f"Leaderboard synced successfully.\n\n{progress.summary()}",
+            )
+        except HTTPException:
+            # The interaction token expires after 15 minutes on long syncs.
+            _logger.warning(
+                "Could not report the finished leaderboard sync",
+            )
 
 
 async def setup(bot: commands.Bot) -> None:
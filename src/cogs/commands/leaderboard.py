@@ -1,5 +1,7 @@
+from functools import partial
 from typing import Literal
 
+from cachetools import TTLCache
 from discord import (
     AllowedMentions,
     Embed,
@@ -7,14 +9,23 @@ from discord import (
     Message,
     User,
     app_commands,
-    utils,
 )
 from discord.ext import commands
 
 from src._colors import LukColors
 from src._settings import config
 from src._utils import datetime_now, datetime_to_relative_past_string
-from src.db.leaderboard import LeaderboardDatabase, MonthlyLeaderboardEntry
+from src.components.leaderboard.top import (
+    LEADERBOARD_PAGE_SIZE,
+    LeaderboardTopPage,
+    LeaderboardTopView,
+)
+from src.db.leaderboard import (
+    LeaderboardCursor,
+    LeaderboardDatabase,
+    MonthlyLeaderboardEntry,
+)
+from src.services.leaderboard import LeaderboardBackfill, countable_content
 
 
 class LeaderboardCog(commands.Cog):
@@ -27,20 +38,43 @@ class LeaderboardCog(commands.Cog):
         self.bot = bot
         self.leaderboard_db = LeaderboardDatabase()
 
+        # Rendered `/leaderboard top` pages, keyed by the generation of what
+        # they were read from, so any change to it invalidates them.
+        self.top_cache: TTLCache[
+            tuple[str, str, int, LeaderboardCursor | None, int],
+            LeaderboardTopPage,
+        ] = TTLCache(maxsize=256, ttl=config.LEADERBOARD_TOP_CACHE_TTL)
+        self.top_cache_hits = 0
+        self.top_cache_misses = 0
+
+    async def cog_load(self) -> None:
+        await self.leaderboard_db.start()
+
+    async def cog_unload(self) -> None:
+        await self.leaderboard_db.stop()
+
+    @commands.Cog.listener("on_connect")
+    async def on_connect(self) -> None:
+        # Messages may have been missed while disconnected, so live runs must
+        # not bridge the gap; it is filled by the catch-up in on_ready.
+        self.leaderboard_db.coverage.break_live_runs()
+
+    @commands.Cog.listener("on_ready")
+    async def on_ready(self) -> None:
+        if guild := self.bot.get_guild(config.GUILD_ID):
+            await LeaderboardBackfill().catch_up(guild)
+
     @commands.Cog.listener("on_message")
     async def on_message(self, message: Message) -> None:
-        if message.author.bot or (
-            not message.content
-            or message.content.isspace()
-            or message.content.startswith(("!", "/", "?"))
-            or len(message.content) < config.MIN_MESSAGE_LENGTH
-        ):
+        if (content := countable_content(message)) is None:
             return
 
-        await self.leaderboard_db.update_user(
+        self.leaderboard_db.record_message(
             user_id=str(message.author.id),
-            message=utils.remove_markdown(message.clean_content).strip(),
+            message=content,
             date=message.created_at,
+            channel_id=message.channel.id,
+            message_id=message.id,
         )
 
     @leaderboard_group.command(
@@ -78,11 +112,22 @@ class LeaderboardCog(commands.Cog):
             MonthlyLeaderboardEntry(message=0, char=0, rank_message=0, rank_char=0),
         )
 
+        recent_activity = ""
+        for days in (7, 30):
+            window = self.leaderboard_db.get_window(str(user.id), days)
+            recent_activity += (
+                f"- Messages in the last {days} days: "
+                f"{window.message:,} (#{window.rank_message:,})\n"
+                if window
+                else f"- Messages in the last {days} days: 0\n"
+            )
+
         embed = Embed(
             description=(
                 f"### {user.mention}'s stats\n"
                 f"- {datetime_now().strftime('%B %Y')} activity points: "
                 f"{activity_points.message:,} (#{activity_points.rank_message:,})\n"
+                f"{recent_activity}"
                 f"- Total messages sent: {user_data.message:,} "
                 f"(#{user_data.rank_message:,})\n"
                 f"- Total characters sent: {user_data.char:,} "
@@ -106,43 +151,107 @@ class LeaderboardCog(commands.Cog):
     )
     @app_commands.describe(
         _type="The type of leaderboard to show (messages or characters).",
+        period="The period to rank activity over.",
     )
     @app_commands.rename(_type="type")
     async def leaderboard_top(
         self,
         interaction: Interaction,
         _type: Literal["messages", "characters"] = "messages",
+        period: Literal["all time", "last 30 days", "last 7 days"] = "all time",
     ) -> None:
         await interaction.response.defer()
 
-        top_users = await self.leaderboard_db.get_top_users(limit=10, _type=_type)
-
-        if not top_users:
+        if (page := await self._load_top_page(_type, period, 0, None)) is None:
             await interaction.edit_original_response(
                 content="No data available for the leaderboard.",
             )
             return
 
+        view = LeaderboardTopView(
+            page,
+            partial(self._load_top_page, _type, period),
+            author_id=interaction.user.id,
+        )
+        view.message = await interaction.edit_original_response(
+            embed=page.embed,
+            view=view,
+        )
+
+    async def _load_top_page(
+        self,
+        _type: Literal["messages", "characters"],
+        period: Literal["all time", "last 30 days", "last 7 days"],
+        page: int,
+        after: LeaderboardCursor | None,
+    ) -> LeaderboardTopPage | None:
+        key = (_type, period, page, after, self._top_generation(period))
+        if (cached := self.top_cache.get(key)) is not None:
+            self.top_cache_hits += 1
+            return cached
+        self.top_cache_misses += 1
+
+        top_users = (
+            await self.leaderboard_db.get_top_users(
+                limit=LEADERBOARD_PAGE_SIZE,
+                _type=_type,
+                after=after,
+            )
+            if period == "all time"
+            else self.leaderboard_db.get_top_window(
+                days=30 if period == "last 30 days" else 7,
+                limit=LEADERBOARD_PAGE_SIZE,
+                _type=_type,
+                after=after,
+            )
+        )
+
+        if not top_users:
+            return None
+
+        field = "message" if _type == "messages" else "char"
+        first_rank = page * LEADERBOARD_PAGE_SIZE + 1
+
         embed = Embed(
-            title=f"Top 10 users by {_type}",
+            title=f"Top users by {_type} ({period})",
             colour=LukColors.primary_blue,
         )
 
-        embed.description = ""
-
         strings: list[str] = []
 
-        for idx, user_data in enumerate(top_users, start=1):
-            stat_value = getattr(
-                user_data,
-                "message" if _type == "messages" else "char",
-            )
+        for idx, user_data in enumerate(top_users, start=first_rank):
+            stat_value = getattr(user_data, field)
             strings.append(
                 f"**{idx}.** <@{user_data.user_id}> - {stat_value:,} {_type}",
             )
 
         embed.description = "\n".join(strings)
-        await interaction.edit_original_response(embed=embed)
+        embed.set_footer(
+            text=f"Ranks {first_rank:,}-{first_rank + len(top_users) - 1:,}",
+        )
+
+        last = top_users[-1]
+        top_page = LeaderboardTopPage(
+            embed=embed,
+            cursor=LeaderboardCursor(
+                score=getattr(last, field),
+                rank=getattr(last, f"rank_{field}"),
+                user_id=last.user_id,
+            ),
+            full=len(top_users) == LEADERBOARD_PAGE_SIZE,
+        )
+        self.top_cache[key] = top_page
+        return top_page
+
+    def _top_generation(
+        self,
+        period: Literal["all time", "last 30 days", "last 7 days"],
+    ) -> int:
+        if period != "all time":
+            return self.leaderboard_db.windows.generation
+        if self.leaderboard_db.index.loaded:
+            return self.leaderboard_db.index.generation
+        return self.leaderboard_db.ranker.generation
 
 
 async def setup(bot: commands.Bot) -> None:
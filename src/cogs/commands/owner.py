@@ -3,7 +3,10 @@ from typing import Literal
 from discord.ext import commands
 
 from src._emojis import LukEmojis
+from src.cogs.commands.leaderboard import LeaderboardCog
 from src.components.member_join import MemberJoinView
+from src.components.team.edit_scheduler import GroupEditScheduler
+from src.db.leaderboard import LeaderboardDatabase
 
 
 class OwnerCog(commands.Cog):
@@ -18,6 +21,46 @@ class OwnerCog(commands.Cog):
         msg = await ctx.send(view=MemberJoinView(ctx.author))
         await msg.add_reaction(LukEmojis.wave)
 
+    @commands.command(name="metrics", hidden=True)
+    @commands.is_owner()
+    async def metrics(self, ctx: commands.Context[commands.Bot]) -> None:
+        leaderboard_db = LeaderboardDatabase()
+        buffer = leaderboard_db.buffer
+        stats = buffer.stats
+        ranker = leaderboard_db.ranker
+        leaderboard_cog = self.bot.get_cog(LeaderboardCog.__cog_name__)
+        edits = GroupEditScheduler().stats
+
+        await ctx.reply(
+            "**Leaderboard write buffer**\n"
+            f"- Queue depth: {buffer.queue_depth:,} messages "
+            f"({buffer.pending_users:,} users)\n"
+            f"- Flushes: {stats.flushes:,} ({stats.failed_flushes:,} failed)\n"
+            f"- Flushed messages: {stats.flushed_messages:,}\n"
+            f"- Last batch: {stats.last_batch_size:,} messages, "
+            f"{stats.last_batch_users:,} users\n"
+            f"- Flush latency: {stats.last_flush_latency * 1000:.1f}ms last, "
+            f"{stats.max_flush_latency * 1000:.1f}ms max\n"
+            "**Leaderboard ranking**\n"
+            f"- Generation: {ranker.generation:,}\n"
+            f"- Last refresh: {ranker.last_refresh_users:,} entries in "
+            f"{ranker.last_refresh_latency * 1000:.1f}ms\n"
+            "**Leaderboard top cache**\n"
+            + (
+                f"- Hits: {leaderboard_cog.top_cache_hits:,}, "
+                f"misses: {leaderboard_cog.top_cache_misses:,}, "
+                f"entries: {len(leaderboard_cog.top_cache):,}"
+                if isinstance(leaderboard_cog, LeaderboardCog)
+                else "- Not loaded"
+            )
+            + "\n**Team group edits**\n"
+            f"- Changes: {edits.mutations:,}, edits: {edits.edits:,} "
+            f"({edits.failed_edits:,} failed)\n"
+            f"- Edits per change: {edits.edits_per_mutation:.2f}\n"
+            f"- Edit lag: {edits.last_edit_lag * 1000:.0f}ms last, "
+            f"{edits.max_edit_lag * 1000:.0f}ms max",
+        )
+
     @commands.command(name="sync", hidden=True)
     @commands.is_owner()
     @commands.max_concurrency(number=1, per=commands.BucketType.default, wait=False)
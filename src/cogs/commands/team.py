@@ -1,3 +1,5 @@
+from datetime import timedelta
+
 from discord import (
     AllowedMentions,
     Embed,
@@ -7,15 +9,25 @@ from discord import (
     app_commands,
 )
 from discord.ext import commands
+from discord.utils import format_dt
 
 from src._colors import LukColors
 from src._constants import TeamPreset
+from src._settings import config
+from src._team import ROLES
+from src._utils import chunk_lines, datetime_now
 from src.components.team.create_group import (
     CreateGroupModal,
     GroupView,
 )
 from src.components.team.edit_group import EditGroupModal
+from src.components.team.edit_scheduler import GroupEditScheduler
+from src.db.team import TeamGroupDatabase, TeamGroupSummary
 from src.embeds.team.group_controller import GroupEmbedController
+from src.services.team import TeamGroupSweeper, TeamReminders, closed_notice
+
+# Embeds of one message share 6000 characters, so every page is a message.
+_DESCRIPTION_CHARS = 4096
 
 
 @app_commands.guild_only()
@@ -42,6 +54,17 @@ class TeamCog(commands.Cog):
         self.bot.tree.add_command(self.team_edit_ctx)
         self.bot.tree.add_command(self.team_delete_ctx)
 
+    async def cog_load(self) -> None:
+        await TeamReminders().start(self.bot)
+        TeamGroupSweeper().start(self.bot)
+
+    async def cog_unload(self) -> None:
+        await TeamReminders().stop()
+        await TeamGroupSweeper().stop()
+        # Groups are saved before their edits are scheduled, the drain only
+        # flushes the message renders still pending.
+        await GroupEditScheduler().drain()
+
     @app_commands.command(
         name="team",
         description="Create a team group",
@@ -53,6 +76,74 @@ class TeamCog(commands.Cog):
     ) -> None:
         await interaction.response.send_modal(CreateGroupModal(preset))
 
+    @app_commands.command(
+        name="teams",
+        description="List the open team groups",
+    )
+    @app_commands.describe(
+        within="Only groups starting within this many hours",
+        preset="Only groups created from this preset",
+        free_tank="Only groups with a free tank slot",
+    )
+    async def list_teams(
+        self,
+        interaction: Interaction,
+        within: app_commands.Range[int, 1, 24 * 7] | None = None,
+        preset: TeamPreset | None = None,
+        free_tank: bool = False,  # noqa: FBT001, FBT002
+    ) -> None:
+        now = datetime_now()
+        groups = await TeamGroupDatabase().find_active(
+            # Groups stay open until the sweeper closes them.
+            start=now - timedelta(seconds=config.TEAM_CLOSE_GRACE),
+            end=now + timedelta(hours=within) if within is not None else None,
+            preset=preset,
+            free_tank=free_tank,
+        )
+
+        # A blank line between groups, which the chunks strip at their ends.
+        pages = [
+            chunk.strip()
+            for chunk in chunk_lines(
+                (
+                    f"{self._format_group(group, interaction.guild_id)}\n"
+                    for group in groups
+                ),
+                _DESCRIPTION_CHARS,
+            )
+        ] or ["No open team matches."]
+
+        embeds = [
+            Embed(
+                title="Open teams",
+                description=page,
+                colour=LukColors.primary_blue,
+            )
+            for page in pages
+        ]
+        await interaction.response.send_message(embed=embeds[0], ephemeral=True)
+        for embed in embeds[1:]:
+            await interaction.followup.send(embed=embed, ephemeral=True)
+
+    def _format_group(self, group: TeamGroupSummary, guild_id: int | None) -> str:
+        roles = " · ".join(
+            f"{ROLES[role].emoji} {group.filled[role]}"
+            + (
+                f"/{int(limit)}"
+                if (limit := group.limits[role]) != float("inf")
+                else ""
+            )
+            for role in group.roles
+        )
+        url = (
+            f"https://discord.com/channels/{guild_id}/"
+            f"{config.BPSR_GROUP_CHANNEL_ID}/{group.message_id}"
+        )
+        return (
+            f"**[{group.name}]({url})** {format_dt(group.time, 'R')} "
+            f"by <@{group.owner_id}>\n{roles}"
+        )
+
     @app_commands.default_permissions(administrator=True)
     @app_commands.guild_only()
     async def team_list_command(
@@ -72,7 +163,7 @@ class TeamCog(commands.Cog):
             await interaction.followup.send("This message has no embeds.")
             return
 
-        controller = GroupEmbedController.from_message(message.embeds[0], message.id)
+        controller = await GroupEmbedController.get(message.id, message.embeds[0])
 
         if (
             interaction.user.id != controller.data.owner.id
@@ -91,12 +182,12 @@ class TeamCog(commands.Cog):
             )
             return
 
-        msg = await thread.send(
-            content=controller.generate_list(interaction.user),
-            allowed_mentions=AllowedMentions.all(),
-        )
+        messages = [
+            await thread.send(content=content, allowed_mentions=AllowedMentions.all())
+            for content in controller.generate_list(interaction.user)
+        ]
         await interaction.edit_original_response(
-            content=f"Sent team call. {msg.jump_url}",
+            content=f"Sent team call. {messages[0].jump_url}",
         )
 
     @app_commands.default_permissions(administrator=True)
@@ -116,11 +207,7 @@ class TeamCog(commands.Cog):
             await interaction.followup.send("This message has no embeds.")
             return
 
-        controller = GroupEmbedController.from_message(
-            message.embeds[0],
-            message.id,
-            no_cache=True,
-        )
+        controller = await GroupEmbedController.get(message.id, message.embeds[0])
 
         if (
             interaction.user.id != controller.data.owner.id
@@ -154,7 +241,7 @@ class TeamCog(commands.Cog):
             await interaction.followup.send("This message has no embeds.")
             return
 
-        controller = GroupEmbedController.from_message(message.embeds[0], message.id)
+        controller = await GroupEmbedController.get(message.id, message.embeds[0])
 
         if (
             interaction.user.id != controller.data.owner.id
@@ -166,6 +253,8 @@ class TeamCog(commands.Cog):
             return
 
         await message.edit(view=None)
+        await GroupEmbedController.discard(message.id)
+        TeamReminders().cancel(message.id)
 
         thread = message.thread or await message.fetch_thread()
 
@@ -175,15 +264,7 @@ class TeamCog(commands.Cog):
             )
             return
 
-        await thread.send(
-            embed=Embed(
-                description="This team has been closed and is no longer active.",
-                colour=LukColors.primary_blue,
-            ).set_author(
-                name=interaction.user.name,
-                icon_url=interaction.user.display_avatar.url,
-            ),
-        )
+        await thread.send(embed=closed_notice(interaction.user))
 
         await interaction.edit_original_response(
             content="Closed successfully.",
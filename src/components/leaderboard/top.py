@@ -0,0 +1,146 @@
+import asyncio
+import contextlib
+from collections.abc import Callable, Coroutine
+from dataclasses import dataclass
+from typing import Any
+
+from discord import ButtonStyle, Embed, HTTPException, Interaction, Message, ui
+
+from src.db.leaderboard import LeaderboardCursor
+
+LEADERBOARD_PAGE_SIZE = 10
+
+
+@dataclass(slots=True)
+class LeaderboardTopPage:
+    embed: Embed
+    cursor: LeaderboardCursor
+    # A short page is the last one.
+    full: bool
+
+
+type LeaderboardPageLoader = Callable[
+    [int, LeaderboardCursor],
+    Coroutine[Any, Any, LeaderboardTopPage | None],
+]
+
+
+class LeaderboardTopView(ui.View):
+    """Previous and next buttons for a `/leaderboard top` message.
+
+    Pages are fetched after the cursor of the page before them and kept on
+    the view, and the page after the current one is prefetched, so flipping
+    through pages already seen never queries the leaderboard again.
+    """
+
+    def __init__(
+        self,
+        first_page: LeaderboardTopPage,
+        load_page: LeaderboardPageLoader,
+        author_id: int,
+    ) -> None:
+        super().__init__(timeout=300)
+        self.pages = [first_page]
+        self.current = 0
+        self.author_id = author_id
+        # Set once the view is sent, to disable it on timeout.
+        self.message: Message | None = None
+
+        self._load_page = load_page
+        self._exhausted = not first_page.full
+        self._prefetch: asyncio.Task[LeaderboardTopPage | None] | None = None
+        # Quick clicks must not append the same page twice.
+        self._fetch_lock = asyncio.Lock()
+
+        self._update_buttons()
+        self._start_prefetch()
+
+    async def interaction_check(self, interaction: Interaction) -> bool:
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message(
+                content="Use `/leaderboard top` to browse the leaderboard yourself.",
+                ephemeral=True,
+            )
+            return False
+        return True
+
+    async def on_timeout(self) -> None:
+        if self._prefetch is not None:
+            self._prefetch.cancel()
+
+        self.previous_button.disabled = True
+        self.next_button.disabled = True
+        if self.message is not None:
+            with contextlib.suppress(HTTPException):
+                await self.message.edit(view=self)
+
+    @ui.button(label="Previous", style=ButtonStyle.secondary)
+    async def previous_button(
+        self,
+        interaction: Interaction,
+        _: ui.Button["LeaderboardTopView"],
+    ) -> None:
+        self.current = max(self.current - 1, 0)
+        self._update_buttons()
+        await interaction.response.edit_message(
+            embed=self.pages[self.current].embed,
+            view=self,
+        )
+
+    @ui.button(label="Next", style=ButtonStyle.secondary)
+    async def next_button(
+        self,
+        interaction: Interaction,
+        _: ui.Button["LeaderboardTopView"],
+    ) -> None:
+        if not await self._fetch_next():
+            self._update_buttons()
+            await interaction.response.edit_message(view=self)
+            return
+
+        self.current += 1
+        self._update_buttons()
+        await interaction.response.edit_message(
+            embed=self.pages[self.current].embed,
+            view=self,
+        )
+        self._start_prefetch()
+
+    async def _fetch_next(self) -> bool:
+        """Load the page after the current one, returning False if there is none."""
+        async with self._fetch_lock:
+            # Another click may have loaded it while this one waited.
+            if self.current + 1 < len(self.pages):
+                return True
+            if self._exhausted:
+                return False
+
+            page = await (
+                self._prefetch
+                or self._load_page(len(self.pages), self.pages[-1].cursor)
+            )
+            self._prefetch = None
+
+            if page is None:
+                self._exhausted = True
+                return False
+
+            self.pages.append(page)
+            self._exhausted = not page.full
+            return True
+
+    def _start_prefetch(self) -> None:
+        if self._exhausted or self._prefetch is not None:
+            return
+        if self.current + 1 < len(self.pages):
+            return
+
+        self._prefetch = asyncio.create_task(
+            self._load_page(len(self.pages), self.pages[-1].cursor),
+        )
+
+    def _update_buttons(self) -> None:
+        self.previous_button.disabled = self.current == 0
+        self.next_button.disabled = (
+            self.current + 1 == len(self.pages) and self._exhausted
+        )
@@ -1,7 +1,6 @@
 from datetime import timedelta
 from typing import TypedDict
 
-from dateutil.parser import parse
 from discord import (
     ButtonStyle,
     Embed,
@@ -18,11 +17,15 @@ from discord import (
 from discord.utils import format_dt
 
 from src._colors import LukColors
-from src._constants import PRESETS, TeamPreset
+from src._constants import TeamPreset
 from src._emojis import LukEmojis
 from src._settings import config
-from src._utils import TIMEZONES, datetime_now
+from src._team import DEFAULT_SCHEMA, SCHEMAS
+from src._time import format_time, parse_time
+from src._utils import datetime_now
+from src.components.team.edit_scheduler import GroupEditScheduler
 from src.embeds.team.group_controller import IMAGINE_EMOJIS, GroupEmbedController
+from src.services.team import TeamReminders
 
 
 class CreateGroupModal(ui.Modal):
@@ -33,6 +36,7 @@ class CreateGroupModal(ui.Modal):
         )
 
         self.preset = preset
+        self.schema = SCHEMAS.get(preset, DEFAULT_SCHEMA)
 
         self.group_name = ui.TextInput["CreateGroupModal"](
             label="Name or Objective",
@@ -53,7 +57,7 @@ class CreateGroupModal(ui.Modal):
             label="Preferred Meeting Time (future only)",
             style=TextStyle.short,
             placeholder="e.g., '2024-12-31 20:00 BRT' or 'Dec 31 8pm EST'",
-            default=(datetime_now() + timedelta(hours=1)).strftime("%Y-%m-%d %H:%M %Z"),
+            default=format_time(datetime_now() + timedelta(hours=1)),
             required=True,
         )
 
@@ -62,7 +66,7 @@ class CreateGroupModal(ui.Modal):
             style=TextStyle.short,
             placeholder=("e.g., 'DPS:3 Sup:1 Tank:1' for 3 DPS, 1 Sup, 1 Tank"),
             required=False,
-            default=self._get_preset(preset),
+            default=self.schema.format_limits(self.schema.default_limits),
         )
 
         self.add_item(self.group_name)
@@ -70,54 +74,16 @@ class CreateGroupModal(ui.Modal):
         self.add_item(self.time)
         self.add_item(self.fields)
 
-    def _get_preset(self, preset: TeamPreset) -> str:
-        return " ".join(
-            f"{field['name']}:{field['default_limit']}"
-            for field in PRESETS.get(preset, PRESETS[TeamPreset.BPSR5])
-        )
-
-    def parse_limit(
-        self,
-    ) -> tuple[float, float, float]:
-        dps, healers, tanks = 3, 1, 1
-        if not self.fields.value:
-            return dps, healers, tanks
-
-        try:
-            parts = self.fields.value.split()
-            for part in parts:
-                role_part = part.split(":")
-                if len(role_part) != 2:  # noqa: PLR2004
-                    role = role_part[0]
-                    count = float("inf")
-                else:
-                    role, count = role_part
-
-                count_int = float(count)
-                if role.lower() == "dps":
-                    dps = count_int
-                elif role.lower() == "sup":
-                    healers = count_int
-                elif role.lower() == "tank":
-                    tanks = count_int
-        except ValueError:
-            return dps, healers, tanks
-        else:
-            return dps, healers, tanks
-
     async def on_submit(self, interaction: Interaction) -> None:
         group_name = self.group_name.value
         description = self.description.value
         leader = interaction.user
-        dps_limit, healer_limit, tank_limit = self.parse_limit()
-        time = parse(
-            self.time.value,
-            tzinfos=TIMEZONES,
-        )
-
-        if not time:
+        limits = self.schema.parse_limits(self.fields.value)
+        try:
+            time = parse_time(self.time.value)
+        except ValueError as exc:
             msg = f"Invalid date format. {self.time.value!r} could not be parsed."
-            raise ValueError(msg)
+            raise ValueError(msg) from exc
 
         if datetime_now().timestamp() > time.timestamp():
             msg = "The specified time is in the past. Please provide a future time."
@@ -125,13 +91,13 @@ class CreateGroupModal(ui.Modal):
 
         controller = GroupEmbedController(
             name=group_name,
-            dps_limit=dps_limit,
-            healer_limit=healer_limit,
-            tank_limit=tank_limit,
+            limits=limits,
             time=time,
             desc=description,
             owner=leader,
+            schema=self.schema,
         )
+        controller.preset = self.preset
 
         await interaction.response.send_message(
             embed=controller.embed,
@@ -174,6 +140,8 @@ class _ConfirmGroupCreateView(ui.View):
             return
 
         msg = await channel.send(embed=self.controller.embed, view=GroupView())
+        await self.controller.save(msg.id)
+        await TeamReminders().schedule(msg.id, self.controller.data.time)
         thread = await msg.create_thread(
             name=self.controller.data.name,
             reason="New group created",
@@ -253,13 +221,13 @@ class GroupView(ui.View):
 
         await interaction.response.defer()
 
-        controller = GroupEmbedController.from_message(
+        controller = await GroupEmbedController.get(
+            interaction.message.id,
             interaction.message.embeds[0],
-            message_id=interaction.message.id,
         )
         controller.remove_member(interaction.user)
-
-        await interaction.edit_original_response(embed=controller.embed)
+        await controller.save(interaction.message.id)
+        GroupEditScheduler().schedule(interaction.message, controller)
 
         await interaction.followup.send(
             content=(
@@ -333,12 +301,6 @@ _role_mapping: dict[str, _RoleMapping] = {
     },
 }
 
-_role_map = {
-    "dps": "Damage",
-    "healer": "Support",
-    "tank": "Tank",
-}
-
 
 class JoinGroupView(ui.View):
     def __init__(self, message: Message) -> None:
@@ -392,6 +354,14 @@ class JoinGroupView(ui.View):
                     (' and ' if (airona or tina) and basilisk else '')
                 }{basilisk}."
                 f"{' You are also helping!' if user.help else ''}"
+                f"{
+                    (
+                        ' The role is full, you are on its waitlist and will be'
+                        ' told when a spot opens up.'
+                    )
+                    if controller.is_waiting(member)
+                    else ''
+                }"
             )
 
         return "Missing user in group data."
@@ -418,18 +388,17 @@ class JoinGroupView(ui.View):
         await interaction.response.defer()
 
         selected_role = _role_mapping[select.values[0]]
-        controller = GroupEmbedController.from_message(
+        controller = await GroupEmbedController.get(
+            self.message.id,
             self.message.embeds[0],
-            message_id=self.message.id,
         )
         controller.add_member(
             member=interaction.user,
             role=selected_role["role"],
             emoji=selected_role["emoji"],
         )
-
-        await self.message.edit(embed=controller.embed)
-        self.message.embeds[0] = controller.embed
+        await controller.save(self.message.id)
+        GroupEditScheduler().schedule(self.message, controller)
 
         await interaction.edit_original_response(
             content=self.get_response_message(controller, interaction.user),
@@ -470,9 +439,9 @@ class JoinGroupView(ui.View):
             elif name == "basilisk":
                 basilisk = index
 
-        controller = GroupEmbedController.from_message(
+        controller = await GroupEmbedController.get(
+            self.message.id,
             self.message.embeds[0],
-            message_id=self.message.id,
         )
         controller.set_imagine(
             member=interaction.user,
@@ -480,9 +449,8 @@ class JoinGroupView(ui.View):
             airona=airona,
             basilisk=basilisk,
         )
-
-        await self.message.edit(embed=controller.embed)
-        self.message.embeds[0] = controller.embed
+        await controller.save(self.message.id)
+        GroupEditScheduler().schedule(self.message, controller)
 
         await interaction.edit_original_response(
             content=self.get_response_message(controller, interaction.user),
@@ -501,14 +469,13 @@ class JoinGroupView(ui.View):
     ) -> None:
         await interaction.response.defer()
 
-        controller = GroupEmbedController.from_message(
+        controller = await GroupEmbedController.get(
+            self.message.id,
             self.message.embeds[0],
-            message_id=self.message.id,
         )
         controller.toggle_help(member=interaction.user)
-
-        await self.message.edit(embed=controller.embed)
-        self.message.embeds[0] = controller.embed
+        await controller.save(self.message.id)
+        GroupEditScheduler().schedule(self.message, controller)
 
         await interaction.edit_original_response(
             content=self.get_response_message(controller, interaction.user),
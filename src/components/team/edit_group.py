@@ -1,4 +1,3 @@
-from dateutil.parser import parse
 from discord import (
     Interaction,
     Message,
@@ -6,8 +5,11 @@ from discord import (
     ui,
 )
 
-from src._utils import TIMEZONES, datetime_now
-from src.embeds.team.group_controller import GroupEmbedController
+from src._time import format_time, parse_time
+from src._utils import datetime_now
+from src.components.team.edit_scheduler import GroupEditScheduler
+from src.embeds.team.group_controller import GroupEmbedController, group_lock
+from src.services.team import TeamReminders
 
 
 class EditGroupModal(ui.Modal):
@@ -40,7 +42,7 @@ class EditGroupModal(ui.Modal):
             label="Preferred Meeting Time (future only)",
             style=TextStyle.short,
             placeholder="e.g., '2024-12-31 20:00 BRT' or 'Dec 31 8pm EST'",
-            default=controller.data.time.strftime("%Y-%m-%d %H:%M %Z"),
+            default=format_time(controller.data.time),
             required=True,
         )
 
@@ -49,7 +51,7 @@ class EditGroupModal(ui.Modal):
             style=TextStyle.short,
             placeholder=("e.g., 'DPS:3 Sup:1 Tank:1' for 3 DPS, 1 Sup, 1 Tank"),
             required=False,
-            default=self._limits_to_text_input(controller),
+            default=controller.schema.format_limits(controller.data.limits),
         )
 
         self.add_item(self.group_name)
@@ -57,74 +59,39 @@ class EditGroupModal(ui.Modal):
         self.add_item(self.time)
         self.add_item(self.fields)
 
-    def _limits_to_text_input(self, controller: GroupEmbedController) -> str:
-        def _format_limit(value: float, role: str) -> str:
-            if value == float("inf"):
-                return role
-            if value.is_integer():
-                return f"{role}:{int(value)}"
-            return f"{role}:{value}"
-
-        return (
-            f"{_format_limit(controller.data.dps_limit, 'DPS')} "
-            f"{_format_limit(controller.data.healer_limit, 'Sup')} "
-            f"{_format_limit(controller.data.tank_limit, 'Tank')}"
-        )
-
-    def parse_limit(
-        self,
-    ) -> tuple[float, float, float]:
-        dps, healers, tanks = 3, 1, 1
-        if not self.fields.value:
-            return dps, healers, tanks
-
-        try:
-            parts = self.fields.value.split()
-            for part in parts:
-                role_part = part.split(":")
-                if len(role_part) != 2:  # noqa: PLR2004
-                    role = role_part[0]
-                    count = float("inf")
-                else:
-                    role, count = role_part
-
-                count_int = float(count)
-                if role.lower() == "dps":
-                    dps = count_int
-                elif role.lower() == "sup":
-                    healers = count_int
-                elif role.lower() == "tank":
-                    tanks = count_int
-        except ValueError:
-            return dps, healers, tanks
-        else:
-            return dps, healers, tanks
-
     async def on_submit(self, interaction: Interaction) -> None:
         await interaction.response.defer(thinking=True, ephemeral=True)
 
         group_name = self.group_name.value
         description = self.description.value
-        dps_limit, healer_limit, tank_limit = self.parse_limit()
-        time = parse(
-            self.time.value,
-            tzinfos=TIMEZONES,
-        )
-
-        if not time:
+        try:
+            time = parse_time(self.time.value)
+        except ValueError as exc:
             msg = f"Invalid date format. {self.time.value!r} could not be parsed."
-            raise ValueError(msg)
+            raise ValueError(msg) from exc
 
         if datetime_now().timestamp() > time.timestamp():
             msg = "The specified time is in the past. Please provide a future time."
             raise ValueError(msg)
 
-        self.controller.data.name = group_name
-        self.controller.data.desc = description
-        self.controller.data.dps_limit = dps_limit
-        self.controller.data.healer_limit = healer_limit
-        self.controller.data.tank_limit = tank_limit
-        self.controller.data.time = time
+        # Members may have joined while the modal was open.
+        controller = await GroupEmbedController.get(self.message.id)
+        limits = controller.schema.parse_limits(self.fields.value)
+
+        async with group_lock(self.message.id):
+            rescheduled = controller.data.time != time
+
+            controller.data.name = group_name
+            controller.data.desc = description
+            controller.data.limits = list(limits)
+            controller.data.time = time
+            controller.invalidate()
+            await controller.save(self.message.id)
+
+            await self.message.edit(embed=controller.embed)
+            # Raising a limit promotes waitlisted members.
+            await GroupEditScheduler().notify_promoted(self.message, controller)
 
-        await self.message.edit(embed=self.controller.embed)
+        if rescheduled:
+            await TeamReminders().schedule(self.message.id, time)
         await interaction.edit_original_response(content="Updated successfully.")
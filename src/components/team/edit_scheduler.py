@@ -0,0 +1,129 @@
+import asyncio
+import contextlib
+from dataclasses import dataclass, field
+from logging import getLogger
+from time import perf_counter
+from typing import Self
+
+from discord import AllowedMentions, HTTPException, Message
+
+from src._settings import config
+from src.embeds.team.group_controller import GroupEmbedController, group_lock
+
+_logger = getLogger("luk.team.edits")
+
+
+@dataclass(slots=True)
+class GroupEditStats:
+    mutations: int = 0
+    edits: int = 0
+    failed_edits: int = 0
+    last_edit_lag: float = 0.0
+    max_edit_lag: float = 0.0
+
+    @property
+    def edits_per_mutation(self) -> float:
+        return self.edits / self.mutations if self.mutations else 0.0
+
+
+@dataclass(slots=True)
+class _PendingEdit:
+    message: Message
+    controller: GroupEmbedController
+    since: float = field(default_factory=perf_counter)
+    wakeup: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class GroupEditScheduler:
+    """Coalesces the embed edits of team group messages.
+
+    The first change to a group schedules an edit `TEAM_EDIT_WINDOW`
+    seconds later, and every change made until then rides along with it,
+    so a burst of joins costs a single edit of the latest state instead of
+    one rate-limited edit each. Edits run under the group's lock, so they
+    are applied in order.
+    """
+
+    __instance: Self | None = None
+
+    def __new__(cls) -> Self:
+        if cls.__instance is None:
+            cls.__instance = super().__new__(cls)
+
+        return cls.__instance
+
+    def __init__(self) -> None:
+        if hasattr(self, "_pending"):
+            return
+
+        self._pending: dict[int, _PendingEdit] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._window = config.TEAM_EDIT_WINDOW
+
+        self.stats = GroupEditStats()
+
+    def schedule(self, message: Message, controller: GroupEmbedController) -> None:
+        """Publish the controller's state on its message soon."""
+        self.stats.mutations += 1
+
+        if (pending := self._pending.get(message.id)) is not None:
+            pending.message = message
+            pending.controller = controller
+            return
+
+        self._pending[message.id] = _PendingEdit(message, controller)
+
+        task = asyncio.create_task(self._flush(message.id), name="team-edit")
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def drain(self) -> None:
+        """Apply every scheduled edit now, e.g. before shutting down."""
+        for pending in self._pending.values():
+            pending.wakeup.set()
+
+        await asyncio.gather(*self._tasks)
+
+    async def notify_promoted(
+        self,
+        message: Message,
+        controller: GroupEmbedController,
+    ) -> None:
+        """Tell the members promoted from a waitlist, in the group thread."""
+        if not (promoted := controller.take_promoted()):
+            return
+
+        mentions = " ".join(f"<@{user_id}>" for user_id in promoted)
+        try:
+            thread = message.thread or await message.fetch_thread()
+            await thread.send(
+                content=f"{mentions} a spot opened up, you are in the team now.",
+                allowed_mentions=AllowedMentions(users=True),
+            )
+        except HTTPException:
+            _logger.exception("Failed to notify promoted members of %s", message.id)
+
+    async def _flush(self, message_id: int) -> None:
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(
+                self._pending[message_id].wakeup.wait(),
+                timeout=self._window,
+            )
+
+        async with group_lock(message_id):
+            # Changes made from here on schedule the next edit.
+            pending = self._pending.pop(message_id)
+
+            try:
+                await pending.message.edit(embed=pending.controller.embed)
+            except HTTPException:
+                self.stats.failed_edits += 1
+                _logger.exception("Failed to edit team group %s", message_id)
+                return
+
+            await self.notify_promoted(pending.message, pending.controller)
+
+        lag = perf_counter() - pending.since
+        self.stats.edits += 1
+        self.stats.last_edit_lag = lag
+        self.stats.max_edit_lag = max(self.stats.max_edit_lag, lag)
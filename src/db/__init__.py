@@ -0,0 +1,5 @@
+# Importing the collection modules registers their indexes before
+# `Database.connect` reconciles them.
+from src.db import leaderboard, team
+
+__all__ = ("leaderboard", "team")
@@ -1,39 +1,207 @@
-from typing import Any
+from collections.abc import Mapping, Sequence
+from logging import getLogger
+from typing import Any, ClassVar, cast
 
-from pymongo import AsyncMongoClient
+from bson.codec_options import CodecOptions
+from pymongo import AsyncMongoClient, IndexModel
+from pymongo.errors import OperationFailure, PyMongoError
+from pymongo.operations import DeleteOne, InsertOne, UpdateOne
+from pymongo.results import BulkWriteResult
 
 from src._settings import config
 
+_logger = getLogger("luk.database")
+
+# Index options that make two indexes with the same keys differ.
+_INDEX_OPTIONS = (
+    "unique",
+    "sparse",
+    "partialFilterExpression",
+    "expireAfterSeconds",
+    "wildcardProjection",
+)
+
+
+def _query_shape(value: object) -> object:
+    """Reduce a query to its field and operator names.
+
+    Lists take the shape of their first item, so `$in` and `$or` lists of
+    any length share a shape.
+    """
+    if isinstance(value, dict):
+        items = cast("dict[str, object]", value)
+        return tuple(sorted((key, _query_shape(item)) for key, item in items.items()))
+    if isinstance(value, list):
+        values = cast("list[object]", value)
+        return (_query_shape(values[0]),) if values else ()
+    return None
+
+
+def _same_index(current: Mapping[str, Any], spec: Mapping[str, Any]) -> bool:
+    return list(current["key"].items()) == list(spec["key"].items()) and all(
+        current.get(option) == spec.get(option) for option in _INDEX_OPTIONS
+    )
+
+
+def _has_stage(plan: object, stage: str) -> bool:
+    if isinstance(plan, dict):
+        node = cast("dict[str, object]", plan)
+        return node.get("stage") == stage or any(
+            _has_stage(item, stage) for item in node.values()
+        )
+    if isinstance(plan, list):
+        return any(_has_stage(item, stage) for item in cast("list[object]", plan))
+    return False
+
 
 class Database:
     _client = AsyncMongoClient[Any](config.MONGO_URI)
     _db = _client[config.MONGO_DB_NAME]
 
-    def __init__(self, collection: str) -> None:
+    _indexes: ClassVar[dict[str, dict[str, IndexModel]]] = {}
+    _explained: ClassVar[set[tuple[str, object, tuple[tuple[str, int], ...]]]] = set()
+
+    def __init__(self, collection: str, *, tz_aware: bool = False) -> None:
         self._collection = self._db[collection]
+        if tz_aware:
+            self._collection = self._collection.with_options(
+                codec_options=CodecOptions(tz_aware=True),
+            )
+
+    @classmethod
+    def declare_indexes(cls, collection: str, *indexes: IndexModel) -> None:
+        """Register the indexes a collection needs.
+
+        Declared indexes are created, or rebuilt if their options changed,
+        by `reconcile_indexes` when the database connects.
+        """
+        declared = cls._indexes.setdefault(collection, {})
+        for index in indexes:
+            declared[index.document["name"]] = index
 
     @classmethod
     async def connect(cls) -> None:
         await cls._client.aconnect()
         await cls._client.admin.command("ping")
+        await cls.reconcile_indexes()
+
+    @classmethod
+    async def reconcile_indexes(cls, collection: str | None = None) -> None:
+        for name, declared in cls._indexes.items():
+            if collection is not None and name != collection:
+                continue
+
+            if await cls.is_view(name):
+                _logger.warning("Skipping indexes of %s, it is a view", name)
+                continue
+
+            target = cls._db[name]
+            existing = {
+                index["name"]: index
+                for index in await (await target.list_indexes()).to_list()
+            }
+
+            for index_name, index in declared.items():
+                spec = index.document
+                current = existing.pop(index_name, None)
+
+                if current is not None:
+                    if _same_index(current, spec):
+                        continue
+
+                    _logger.info("Rebuilding index %s.%s", name, index_name)
+                    await target.drop_index(index_name)
+
+                try:
+                    await target.create_indexes([index])
+                except OperationFailure:
+                    # e.g. the same keys already indexed under another name.
+                    _logger.exception("Could not create index %s.%s", name, index_name)
+                    continue
+
+                _logger.info("Created index %s.%s", name, index_name)
+
+            for index_name in existing.keys() - {"_id_"}:
+                _logger.warning("Index %s.%s is not declared", name, index_name)
 
     @classmethod
     async def disconnect(cls) -> None:
         await cls._client.aclose()
 
+    @classmethod
+    async def is_view(cls, collection: str) -> bool:
+        return bool(
+            await cls._db.list_collection_names(
+                filter={"name": collection, "type": "view"},
+            ),
+        )
+
+    @classmethod
+    async def exists(cls, collection: str) -> bool:
+        return bool(await cls._db.list_collection_names(filter={"name": collection}))
+
+    @property
+    def name(self) -> str:
+        return self._collection.name
+
+    async def drop(self) -> None:
+        await self._collection.drop()
+
+    async def drop_index(self, index: str) -> None:
+        """Drop an index if it exists."""
+        if index in await self._collection.index_information():
+            await self._collection.drop_index(index)
+
+    async def _check_plan(
+        self,
+        query: dict[str, Any],
+        sort: list[tuple[str, int]] | None = None,
+    ) -> None:
+        """Warn once per query shape if the server resolves it by a COLLSCAN."""
+        if not config.MONGO_EXPLAIN_QUERIES or (not query and not sort):
+            return
+
+        shape = (self._collection.name, _query_shape(query), tuple(sort or ()))
+        if shape in self._explained:
+            return
+        self._explained.add(shape)
+
+        cursor = self._collection.find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+
+        try:
+            plan = await cursor.explain()
+        except PyMongoError:
+            _logger.debug("Could not explain a query on %s", self.name, exc_info=True)
+            return
+
+        if _has_stage(plan.get("queryPlanner", {}).get("winningPlan"), "COLLSCAN"):
+            _logger.warning(
+                "Query on %s is a collection scan: filter=%s sort=%s",
+                self.name,
+                query,
+                sort,
+            )
+
     async def find_one(
         self,
         query: dict[str, Any],
+        projection: dict[str, int] | None = None,
     ) -> dict[str, Any] | None:
-        return await self._collection.find_one(query)
+        await self._check_plan(query)
+        return await self._collection.find_one(query, projection)
 
     async def find(
         self,
         query: dict[str, Any],
         sort: list[tuple[str, int]] | None = None,
         limit: int | None = None,
+        projection: dict[str, int] | None = None,
     ) -> list[dict[str, Any]]:
-        cursor = self._collection.find(query)
+        await self._check_plan(query, sort)
+
+        cursor = self._collection.find(query, projection)
         if sort:
             cursor = cursor.sort(sort)
         if limit is not None:
@@ -56,14 +224,47 @@ class Database:
     ) -> None:
         await self._collection.update_one(query, update, upsert=upsert)
 
+    async def update_many(
+        self,
+        query: dict[str, Any],
+        update: dict[str, Any],
+    ) -> int:
+        result = await self._collection.update_many(query, update)
+        return result.modified_count
+
+    async def count_documents(self, query: dict[str, Any]) -> int:
+        return await self._collection.count_documents(query)
+
+    async def aggregate(
+        self,
+        pipeline: list[dict[str, Any]],
+    ) -> list[dict[str, Any]]:
+        cursor = await self._collection.aggregate(pipeline)
+        return await cursor.to_list()
+
     async def delete_one(
         self,
         query: dict[str, Any],
     ) -> None:
         await self._collection.delete_one(query)
 
+    async def delete_many(
+        self,
+        query: dict[str, Any],
+    ) -> int:
+        result = await self._collection.delete_many(query)
+        return result.deleted_count
+
     async def insert_many(
         self,
         documents: list[dict[str, Any]],
     ) -> None:
         await self._collection.insert_many(documents)
+
+    async def bulk_write(
+        self,
+        operations: Sequence[InsertOne[Any] | UpdateOne | DeleteOne],
+        *,
+        ordered: bool = False,
+    ) -> BulkWriteResult:
+        return await self._collection.bulk_write(operations, ordered=ordered)
@@ -0,0 +1,273 @@
+import asyncio
+import contextlib
+from collections import Counter
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import datetime
+from logging import getLogger
+from time import perf_counter
+
+from pymongo.errors import BulkWriteError, PyMongoError
+from pymongo.operations import UpdateOne
+
+from src.db._base import Database
+from src.db._leaderboard_coverage import LeaderboardCoverage
+
+_logger = getLogger("luk.leaderboard.buffer")
+
+# Activity bucket periods and the format of their `bucket` key.
+BUCKET_PERIODS = {"month": "%Y-%m", "day": "%Y-%m-%d"}
+
+# Only monthly buckets are ranked, so only they need a rank refresh.
+_RANKED_PERIODS = {"month"}
+
+
+class LeaderboardDeltas:
+    """`$inc` counters aggregated per user and per (user, period, bucket)."""
+
+    __slots__ = ("buckets", "messages", "totals")
+
+    def __init__(self) -> None:
+        self.totals: dict[str, Counter[str]] = {}
+        self.buckets: dict[tuple[str, str, str], Counter[str]] = {}
+        self.messages = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.totals or self.buckets)
+
+    def add(self, user_id: str, length: int, date: datetime) -> None:
+        """Fold one message into the counters it contributes to."""
+        total = self.totals.setdefault(user_id, Counter())
+        total["message"] += 1
+        total["char"] += length
+
+        for period, key_format in BUCKET_PERIODS.items():
+            key = (user_id, period, date.strftime(key_format))
+            bucket = self.buckets.setdefault(key, Counter())
+            bucket["message"] += 1
+            bucket["char"] += length
+
+        self.messages += 1
+
+    def merge_totals(self, totals: dict[str, Counter[str]]) -> None:
+        for user_id, delta in totals.items():
+            self.totals.setdefault(user_id, Counter()).update(delta)
+            self.messages += delta["message"]
+
+    def merge_buckets(self, buckets: dict[tuple[str, str, str], Counter[str]]) -> None:
+        for key, delta in buckets.items():
+            self.buckets.setdefault(key, Counter()).update(delta)
+
+    def total_operations(self) -> list[UpdateOne]:
+        """One upsert per user, flagging it for the next rank refresh."""
+        return [
+            UpdateOne(
+                {"user_id": user_id},
+                {"$inc": dict(delta), "$set": {"dirty": True}},
+                upsert=True,
+            )
+            for user_id, delta in self.totals.items()
+        ]
+
+    def bucket_operations(self) -> list[UpdateOne]:
+        """One upsert per activity bucket touched."""
+        return [
+            UpdateOne(
+                {"user_id": user_id, "period": period, "bucket": bucket},
+                {"$inc": dict(delta), "$set": {"dirty": True}}
+                if period in _RANKED_PERIODS
+                else {"$inc": dict(delta)},
+                upsert=True,
+            )
+            for (user_id, period, bucket), delta in self.buckets.items()
+        ]
+
+
+def _failed_indexes(exc: PyMongoError, count: int) -> list[int]:
+    """Operations of an unordered bulk write that may not have been applied."""
+    if isinstance(exc, BulkWriteError):
+        return [error["index"] for error in exc.details["writeErrors"]]
+    return list(range(count))
+
+
+@dataclass(slots=True)
+class LeaderboardBufferStats:
+    flushes: int = 0
+    failed_flushes: int = 0
+    flushed_messages: int = 0
+    last_batch_size: int = 0
+    last_batch_users: int = 0
+    last_flush_latency: float = 0.0
+    max_flush_latency: float = 0.0
+
+
+class LeaderboardWriteBuffer:
+    """Write-behind buffer merging leaderboard `$inc` deltas.
+
+    Messages are folded into one counter per user and one per activity
+    bucket touched, and written as unordered `bulk_write`s once `max_size`
+    messages are pending or every `interval` seconds.
+
+    The message coverage is snapshotted when the pending deltas are taken
+    and saved once they are written, so it only ever vouches for stored
+    counts.
+    """
+
+    def __init__(
+        self,
+        totals: Database,
+        buckets: Database,
+        *,
+        max_size: int,
+        interval: float,
+        coverage: LeaderboardCoverage | None = None,
+    ) -> None:
+        self._totals = totals
+        self._buckets = buckets
+        self._max_size = max_size
+        self._interval = interval
+        self._coverage = coverage
+
+        self._pending = LeaderboardDeltas()
+
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        # The flush started by `_run`, shielded from its cancellation.
+        self._flushing: asyncio.Task[None] | None = None
+
+        self.stats = LeaderboardBufferStats()
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of messages waiting to be flushed."""
+        return self._pending.messages
+
+    @property
+    def pending_users(self) -> int:
+        return len(self._pending.totals)
+
+    def add(self, user_id: str, length: int, date: datetime) -> None:
+        self._pending.add(user_id, length, date)
+
+        if self._pending.messages >= self._max_size:
+            self._wakeup.set()
+
+    def merge(self, deltas: LeaderboardDeltas) -> None:
+        """Queue already-aggregated counters, e.g. from a backfill."""
+        self._pending.merge_totals(deltas.totals)
+        self._pending.merge_buckets(deltas.buckets)
+
+    @contextlib.asynccontextmanager
+    async def paused(self) -> AsyncIterator[None]:
+        """Hold off flushes, waiting for the one in progress."""
+        async with self._flush_lock:
+            yield
+
+    def discard(self) -> None:
+        """Drop the pending deltas without writing them."""
+        self._pending = LeaderboardDeltas()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="leaderboard-flush")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+        # Deltas of an interrupted flush are swapped out of `_pending`, let it
+        # finish before the final flush.
+        if self._flushing is not None:
+            try:
+                await self._flushing
+            except PyMongoError:
+                _logger.exception("Failed to flush leaderboard buffer")
+            self._flushing = None
+
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._interval)
+            self._wakeup.clear()
+
+            self._flushing = asyncio.create_task(self.flush())
+            try:
+                await asyncio.shield(self._flushing)
+            except PyMongoError:
+                _logger.exception("Failed to flush leaderboard buffer")
+            self._flushing = None
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            if not self._pending and not (self._coverage and self._coverage.dirty):
+                return
+
+            pending, self._pending = self._pending, LeaderboardDeltas()
+            # Messages marked after this are counted in the new `_pending`,
+            # their coverage waits for the flush that writes them.
+            covered = self._coverage.snapshot() if self._coverage else {}
+
+            start = perf_counter()
+            try:
+                await self._write(pending)
+            except PyMongoError:
+                self.stats.failed_flushes += 1
+                if self._coverage:
+                    self._coverage.restore(covered)
+                raise
+
+            latency = perf_counter() - start
+
+            if self._coverage:
+                await self._coverage.save(covered)
+
+        self.stats.flushes += 1
+        self.stats.flushed_messages += pending.messages
+        self.stats.last_batch_size = pending.messages
+        self.stats.last_batch_users = len(pending.totals)
+        self.stats.last_flush_latency = latency
+        self.stats.max_flush_latency = max(self.stats.max_flush_latency, latency)
+
+        _logger.debug(
+            "Flushed %s messages for %s users in %.1fms (%s queued)",
+            pending.messages,
+            len(pending.totals),
+            latency * 1000,
+            self._pending.messages,
+        )
+
+    async def _write(self, pending: LeaderboardDeltas) -> None:
+        """Write both collections, requeueing whatever was not applied."""
+        # Bucket deltas may be requeued on their own after a partial failure.
+        if totals := list(pending.totals.items()):
+            try:
+                await self._totals.bulk_write(
+                    pending.total_operations(),
+                    ordered=False,
+                )
+            except PyMongoError as exc:
+                self._pending.merge_totals(
+                    dict(totals[index] for index in _failed_indexes(exc, len(totals))),
+                )
+                self._pending.merge_buckets(pending.buckets)
+                raise
+
+        if buckets := list(pending.buckets.items()):
+            try:
+                await self._buckets.bulk_write(
+                    pending.bucket_operations(),
+                    ordered=False,
+                )
+            except PyMongoError as exc:
+                self._pending.merge_buckets(
+                    dict(
+                        buckets[index] for index in _failed_indexes(exc, len(buckets))
+                    ),
+                )
+                raise
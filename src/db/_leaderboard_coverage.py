@@ -0,0 +1,188 @@
+from bisect import bisect_left, bisect_right
+from logging import getLogger
+
+from pymongo.errors import PyMongoError
+from pymongo.operations import UpdateOne
+
+from src.db._base import Database
+
+_logger = getLogger("luk.leaderboard.coverage")
+
+
+class _ChannelCoverage:
+    """Sorted, disjoint `[start, end]` ranges of processed message IDs."""
+
+    __slots__ = ("ends", "starts")
+
+    def __init__(self, ranges: list[list[int]] | None = None) -> None:
+        self.starts: list[int] = []
+        self.ends: list[int] = []
+
+        for start, end in ranges or []:
+            self.add(start, end)
+
+    def contains(self, message_id: int) -> bool:
+        index = bisect_right(self.starts, message_id) - 1
+        return index >= 0 and message_id <= self.ends[index]
+
+    def add(self, start: int, end: int) -> None:
+        # Every range that overlaps or touches [start, end] collapses into one.
+        low = bisect_left(self.ends, start - 1)
+        high = bisect_right(self.starts, end + 1)
+
+        if low < high:
+            start = min(start, self.starts[low])
+            end = max(end, self.ends[high - 1])
+
+        self.starts[low:high] = [start]
+        self.ends[low:high] = [end]
+
+    def gaps(self) -> list[tuple[int, int | None]]:
+        """Uncovered ID ranges, the last one open-ended."""
+        gaps: list[tuple[int, int | None]] = []
+        cursor = 0
+
+        for start, end in zip(self.starts, self.ends, strict=True):
+            if start > cursor:
+                gaps.append((cursor, start - 1))
+            cursor = end + 1
+
+        gaps.append((cursor, None))
+        return gaps
+
+    def to_list(self) -> list[list[int]]:
+        return [[start, end] for start, end in zip(self.starts, self.ends, strict=True)]
+
+
+class LeaderboardCoverage:
+    """Tracks which messages have already been counted, per channel.
+
+    Live ingestion extends a run from the previous message it saw in the
+    same channel, so a busy channel collapses into a single range, and the
+    backfill only fetches the gaps between ranges. Both paths skip IDs that
+    are already covered, which makes re-running a backfill idempotent.
+    """
+
+    def __init__(self, db: Database) -> None:
+        self._db = db
+        self._channels: dict[int, _ChannelCoverage] = {}
+        self._live: dict[int, int] = {}
+        self._dirty: set[int] = set()
+
+        self.session_marks: dict[int, int] = {}
+
+    async def load(self) -> bool:
+        """Load the coverage.
+
+        Returns:
+            bool: False if no coverage was stored yet.
+        """
+        self._channels = {
+            document["channel_id"]: _ChannelCoverage(document["ranges"])
+            for document in await self._db.find({})
+        }
+
+        _logger.info("Loaded message coverage for %s channels", len(self._channels))
+        return bool(self._channels)
+
+    async def reset(self) -> None:
+        """Forget every covered message, in memory first, then in the store.
+
+        Messages marked while the store is cleared stay marked, so the
+        buffer must not save coverage before this returns.
+        """
+        self._channels.clear()
+        self._live.clear()
+        self._dirty.clear()
+        self.session_marks = {}
+
+        await self._db.delete_many({})
+
+    def contains(self, channel_id: int, message_id: int) -> bool:
+        coverage = self._channels.get(channel_id)
+        return coverage is not None and coverage.contains(message_id)
+
+    def add(self, channel_id: int, start: int, end: int) -> None:
+        coverage = self._channels.setdefault(channel_id, _ChannelCoverage())
+        coverage.add(start, end)
+        self._dirty.add(channel_id)
+
+    def mark_live(self, channel_id: int, message_id: int) -> None:
+        """Record a message seen on the gateway.
+
+        Everything between the previous live message of the channel and this
+        one was delivered in the same session, so the whole span is covered.
+        """
+        previous = self._live.get(channel_id, message_id)
+        self._live[channel_id] = message_id
+        self.add(channel_id, min(previous, message_id), message_id)
+
+    def break_live_runs(self) -> None:
+        """Start a new gateway session.
+
+        Live runs stop extending so they never bridge a disconnect, and the
+        newest covered ID of each channel is kept as the point to catch up
+        from.
+        """
+        self._live.clear()
+        self.session_marks = {
+            channel_id: coverage.ends[-1]
+            for channel_id, coverage in self._channels.items()
+            if coverage.ends
+        }
+
+    def gaps(self, channel_id: int) -> list[tuple[int, int | None]]:
+        coverage = self._channels.get(channel_id) or _ChannelCoverage()
+        return coverage.gaps()
+
+    def gaps_since_mark(self, channel_id: int) -> list[tuple[int, int | None]]:
+        """Gaps opened after the channel's session mark, i.e. the downtime."""
+        if (mark := self.session_marks.get(channel_id)) is None:
+            return []
+        return [gap for gap in self.gaps(channel_id) if gap[0] > mark]
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._dirty)
+
+    def snapshot(self) -> dict[int, list[list[int]]]:
+        """Take the ranges of the channels changed since the last snapshot."""
+        dirty, self._dirty = self._dirty, set()
+        return {
+            channel_id: self._channels[channel_id].to_list()
+            for channel_id in dirty
+            if channel_id in self._channels
+        }
+
+    def restore(self, snapshot: dict[int, list[list[int]]]) -> None:
+        """Mark the channels of a snapshot that was not saved as changed again."""
+        self._dirty.update(
+            channel_id for channel_id in snapshot if channel_id in self._channels
+        )
+
+    async def save(self, snapshot: dict[int, list[list[int]]] | None = None) -> None:
+        """Save a snapshot, or every change so far.
+
+        Args:
+            snapshot (dict[int, list[list[int]]] | None): Ranges taken by
+                `snapshot`, saved as they were then.
+        """
+        if snapshot is None:
+            snapshot = self.snapshot()
+        if not snapshot:
+            return
+
+        try:
+            await self._db.bulk_write(
+                [
+                    UpdateOne(
+                        {"channel_id": channel_id},
+                        {"$set": {"ranges": ranges}},
+                        upsert=True,
+                    )
+                    for channel_id, ranges in snapshot.items()
+                ],
+            )
+        except PyMongoError:
+            self.restore(snapshot)
+            raise
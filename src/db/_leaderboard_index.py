@@ -0,0 +1,154 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from logging import getLogger
+from time import perf_counter
+
+from src._utils import datetime_now
+from src.db._base import Database
+from src.db._leaderboard_buffer import LeaderboardDeltas
+
+_logger = getLogger("luk.leaderboard.index")
+
+
+class _OrderStatistic:
+    """Scores kept sorted as `(-score, user_id)` keys.
+
+    Rank and top-N lookups are binary searches and slices. Updates remove
+    and re-insert a single key, which only shifts the underlying array.
+    """
+
+    __slots__ = ("_keys", "_scores")
+
+    def __init__(self) -> None:
+        self._keys: list[tuple[int, str]] = []
+        self._scores: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def get(self, user_id: str) -> int | None:
+        return self._scores.get(user_id)
+
+    def set(self, user_id: str, score: int) -> None:
+        if (old := self._scores.get(user_id)) is not None:
+            del self._keys[bisect_left(self._keys, (-old, user_id))]
+
+        self._scores[user_id] = score
+        insort(self._keys, (-score, user_id))
+
+    def add(self, user_id: str, delta: int) -> None:
+        self.set(user_id, self._scores.get(user_id, 0) + delta)
+
+    def discard(self, user_id: str) -> None:
+        if (old := self._scores.pop(user_id, None)) is not None:
+            del self._keys[bisect_left(self._keys, (-old, user_id))]
+
+    def rank(self, user_id: str) -> int | None:
+        """Competition rank (ties share a place), or None if unknown."""
+        if (score := self._scores.get(user_id)) is None:
+            return None
+        return bisect_left(self._keys, (-score,)) + 1
+
+    def top(
+        self,
+        limit: int,
+        after: tuple[int, str] | None = None,
+    ) -> list[tuple[str, int]]:
+        """The `limit` best scores, starting after the given `(score, user_id)`."""
+        start = 0 if after is None else bisect_right(self._keys, (-after[0], after[1]))
+        return [
+            (user_id, -score) for score, user_id in self._keys[start : start + limit]
+        ]
+
+    def clear(self) -> None:
+        self._keys.clear()
+        self._scores.clear()
+
+
+class LeaderboardRankIndex:
+    """Live, in-process rank index over the leaderboard counters.
+
+    Holds all-time and current-month message/character totals for every
+    user. It is loaded from Mongo once and then fed by the ingestion path,
+    so ranks never lag behind the materialized collection.
+    """
+
+    def __init__(self) -> None:
+        self.message = _OrderStatistic()
+        self.char = _OrderStatistic()
+        self.monthly_message = _OrderStatistic()
+        self.monthly_char = _OrderStatistic()
+
+        self.month = datetime_now().strftime("%Y-%m")
+        self.loaded = False
+        # Bumped by every change, so results read from the index can be
+        # cached until it changes.
+        self.generation = 0
+
+    async def load(self, totals: Database, buckets: Database) -> None:
+        start = perf_counter()
+
+        self.clear()
+
+        for document in await totals.find(
+            {},
+            projection={"_id": 0, "user_id": 1, "message": 1, "char": 1},
+        ):
+            user_id: str = document["user_id"]
+            self.message.set(user_id, document.get("message", 0))
+            self.char.set(user_id, document.get("char", 0))
+
+        for document in await buckets.find(
+            {"period": "month", "bucket": self.month},
+            projection={"_id": 0, "user_id": 1, "message": 1, "char": 1},
+        ):
+            user_id = document["user_id"]
+            self.monthly_message.set(user_id, document.get("message", 0))
+            self.monthly_char.set(user_id, document.get("char", 0))
+
+        self.loaded = True
+        self.generation += 1
+        _logger.info(
+            "Loaded rank index for %s users in %.1fms",
+            len(self.message),
+            (perf_counter() - start) * 1000,
+        )
+
+    def clear(self) -> None:
+        """Drop every counter, still counting what is added afterwards."""
+        for index in (self.message, self.char, self.monthly_message, self.monthly_char):
+            index.clear()
+        self.month = datetime_now().strftime("%Y-%m")
+        self.generation += 1
+
+    def add(self, user_id: str, length: int, date: datetime) -> None:
+        if not self.loaded:
+            return
+
+        self.generation += 1
+        self.message.add(user_id, 1)
+        self.char.add(user_id, length)
+
+        month = date.strftime("%Y-%m")
+        if month > self.month:
+            self.month = month
+            self.monthly_message.clear()
+            self.monthly_char.clear()
+
+        if month == self.month:
+            self.monthly_message.add(user_id, 1)
+            self.monthly_char.add(user_id, length)
+
+    def apply(self, deltas: LeaderboardDeltas) -> None:
+        """Apply already-aggregated counters, e.g. from a backfill."""
+        if not self.loaded:
+            return
+
+        self.generation += 1
+        for user_id, delta in deltas.totals.items():
+            self.message.add(user_id, delta["message"])
+            self.char.add(user_id, delta["char"])
+
+            if month := deltas.buckets.get((user_id, "month", self.month)):
+                self.monthly_message.add(user_id, month["message"])
+                self.monthly_char.add(user_id, month["char"])
@@ -0,0 +1,315 @@
+import asyncio
+import contextlib
+from logging import getLogger
+from time import perf_counter
+from typing import Any
+
+from pymongo.errors import PyMongoError
+
+from src.db._base import Database
+
+_logger = getLogger("luk.leaderboard.ranking")
+
+_RANKED_FIELDS = (("message", "rank_message"), ("char", "rank_char"))
+
+# Re-ranking an entry shifts every entry it passes, so once this share of
+# the entries is dirty (after a backfill, say), a full rebuild is cheaper.
+_REBUILD_SHARE = 0.2
+# Below this many dirty entries the incremental pass is always cheap enough.
+_REBUILD_MIN_ENTRIES = 100
+
+
+class LeaderboardRanker:
+    """Maintains the materialized all-time and monthly ranks.
+
+    Every buffered write flags the touched users and month buckets as
+    `dirty`. A refresh pass only visits those: when a counter goes from
+    `old` to `new`, the entries whose value lies in `[old, new)` drop one
+    place, which is a single indexed range update, and the entry's own rank
+    is an indexed count of the values above `new`.
+
+    All-time ranks live in the `leaderboard-ranked` collection. Month
+    buckets carry their own rank next to a `ranked_*` snapshot of the
+    counters those ranks were computed from.
+    """
+
+    def __init__(
+        self,
+        source: Database,
+        ranked: Database,
+        buckets: Database,
+        *,
+        interval: float,
+    ) -> None:
+        self._source = source
+        self._ranked = ranked
+        self._buckets = buckets
+        self._interval = interval
+
+        self._refresh_lock = asyncio.Lock()
+        self._task: asyncio.Task[None] | None = None
+
+        self.generation = 0
+        self.last_refresh_users = 0
+        self.last_refresh_latency = 0.0
+
+    async def setup(self) -> None:
+        """Replace a legacy rank view with a real collection, then build it."""
+        rebuild = not await Database.exists(self._ranked.name)
+
+        if await Database.is_view(self._ranked.name):
+            _logger.info("Replacing %s view with a collection", self._ranked.name)
+            await self._ranked.drop()
+            await Database.reconcile_indexes(self._ranked.name)
+            rebuild = True
+
+        if rebuild:
+            await self.rebuild()
+
+    async def rebuild(self) -> None:
+        """Recompute every rank from scratch with window functions.
+
+        Used for bootstrapping, and by the refresh loop when most entries
+        are dirty at once; otherwise it re-ranks entries one by one.
+        """
+        start = perf_counter()
+
+        await self._source.update_many(
+            {"dirty": True},
+            {"$unset": {"dirty": ""}},
+        )
+        await self._buckets.update_many(
+            {"dirty": True},
+            {"$unset": {"dirty": ""}},
+        )
+
+        await self._source.aggregate(
+            [
+                {
+                    "$setWindowFields": {
+                        "sortBy": {field: -1},
+                        "output": {rank_field: {"$rank": {}}},
+                    },
+                }
+                for field, rank_field in _RANKED_FIELDS
+            ]
+            + [
+                {
+                    "$project": {
+                        "_id": 0,
+                        "user_id": 1,
+                        "message": 1,
+                        "char": 1,
+                        "rank_message": 1,
+                        "rank_char": 1,
+                    },
+                },
+                {
+                    "$merge": {
+                        "into": self._ranked.name,
+                        "on": "user_id",
+                        "whenMatched": "merge",
+                        "whenNotMatched": "insert",
+                    },
+                },
+            ],
+        )
+
+        await self._buckets.aggregate(
+            [{"$match": {"period": "month"}}]
+            + [
+                {
+                    "$setWindowFields": {
+                        "partitionBy": "$bucket",
+                        "sortBy": {field: -1},
+                        "output": {rank_field: {"$rank": {}}},
+                    },
+                }
+                for field, rank_field in _RANKED_FIELDS
+            ]
+            + [
+                {
+                    "$project": {
+                        "_id": 0,
+                        "user_id": 1,
+                        "period": 1,
+                        "bucket": 1,
+                        "ranked_message": "$message",
+                        "ranked_char": "$char",
+                        "rank_message": 1,
+                        "rank_char": 1,
+                    },
+                },
+                {
+                    "$merge": {
+                        "into": self._buckets.name,
+                        "on": ["user_id", "period", "bucket"],
+                        "whenMatched": "merge",
+                        "whenNotMatched": "discard",
+                    },
+                },
+            ],
+        )
+
+        self.generation += 1
+        _logger.info("Rebuilt leaderboard ranks in %.1fs", perf_counter() - start)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="leaderboard-ranking")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+
+            try:
+                await self.refresh()
+            except PyMongoError:
+                _logger.exception("Failed to refresh leaderboard ranks")
+
+    async def refresh(self) -> int:
+        """Re-rank the users and month buckets that changed since the last pass.
+
+        Returns:
+            int: The number of entries that were re-ranked.
+        """
+        async with self._refresh_lock:
+            start = perf_counter()
+            dirty = await self._source.find({"dirty": True})
+            dirty_buckets = await self._buckets.find({"dirty": True})
+            count = len(dirty) + len(dirty_buckets)
+
+            if await self._rebuild_is_cheaper(count):
+                # Bumps the generation itself.
+                await self.rebuild()
+            else:
+                for document in dirty:
+                    await self._rerank_user(document)
+                for document in dirty_buckets:
+                    await self._rerank_bucket(document)
+
+                if count:
+                    self.generation += 1
+
+            if count:
+                self.last_refresh_users = count
+                self.last_refresh_latency = perf_counter() - start
+
+                _logger.debug(
+                    "Re-ranked %s entries in %.1fms",
+                    count,
+                    self.last_refresh_latency * 1000,
+                )
+
+            return count
+
+    async def _rebuild_is_cheaper(self, dirty: int) -> bool:
+        if dirty < _REBUILD_MIN_ENTRIES:
+            return False
+
+        entries = await self._source.count_documents(
+            {},
+        ) + await self._buckets.count_documents({"period": "month"})
+        return dirty > entries * _REBUILD_SHARE
+
+    async def _rerank_user(self, document: dict[str, Any]) -> None:
+        user_id: str = document["user_id"]
+        current = await self._ranked.find_one({"user_id": user_id}) or {}
+        update: dict[str, Any] = {}
+
+        for field, rank_field in _RANKED_FIELDS:
+            rank = await self._rerank(
+                self._ranked,
+                {},
+                user_id,
+                field,
+                rank_field,
+                old=current.get(field),
+                new=document.get(field, 0),
+            )
+            update[field] = document.get(field, 0)
+            if rank is not None:
+                update[rank_field] = rank
+
+        await self._ranked.update_one(
+            {"user_id": user_id},
+            {"$set": update},
+            upsert=True,
+        )
+        # Only clear the flag if no flush landed while this user was re-ranked.
+        await self._source.update_one(
+            {
+                "user_id": user_id,
+                "message": document.get("message", 0),
+                "char": document.get("char", 0),
+            },
+            {"$unset": {"dirty": ""}},
+        )
+
+    async def _rerank_bucket(self, document: dict[str, Any]) -> None:
+        user_id: str = document["user_id"]
+        scope = {"period": document["period"], "bucket": document["bucket"]}
+        update: dict[str, Any] = {}
+
+        for field, rank_field in _RANKED_FIELDS:
+            new = document.get(field, 0)
+            rank = await self._rerank(
+                self._buckets,
+                scope,
+                user_id,
+                f"ranked_{field}",
+                rank_field,
+                old=document.get(f"ranked_{field}"),
+                new=new,
+            )
+            if rank is not None:
+                update[f"ranked_{field}"] = new
+                update[rank_field] = rank
+
+        if update:
+            await self._buckets.update_one(
+                {"user_id": user_id, **scope},
+                {"$set": update},
+            )
+        # As for users, a flush that landed meanwhile keeps the bucket dirty.
+        await self._buckets.update_one(
+            {
+                "user_id": user_id,
+                **scope,
+                "message": document.get("message", 0),
+                "char": document.get("char", 0),
+            },
+            {"$unset": {"dirty": ""}},
+        )
+
+    async def _rerank(  # noqa: PLR0913
+        self,
+        ranked: Database,
+        scope: dict[str, Any],
+        user_id: str,
+        field: str,
+        rank_field: str,
+        *,
+        old: int | None,
+        new: int,
+    ) -> int | None:
+        if old == new:
+            return None
+
+        passed: dict[str, int] = {"$lt": new}
+        if old is not None:
+            passed["$gte"] = old
+
+        await ranked.update_many(
+            {**scope, field: passed, "user_id": {"$ne": user_id}},
+            {"$inc": {rank_field: 1}},
+        )
+
+        return await ranked.count_documents({**scope, field: {"$gt": new}}) + 1
@@ -0,0 +1,204 @@
+from datetime import date, datetime
+from logging import getLogger
+from time import perf_counter
+
+from src._utils import datetime_now
+from src.db._base import Database
+from src.db._leaderboard_buffer import LeaderboardDeltas
+from src.db._leaderboard_index import _OrderStatistic
+
+_logger = getLogger("luk.leaderboard.windows")
+
+# Rolling windows, in days, that can be ranked.
+WINDOWS = (7, 30)
+
+_RING_SIZE = max(WINDOWS)
+
+
+class _DailyRing:
+    """A user's message and character counts of the last `_RING_SIZE` days.
+
+    Slots are indexed by day ordinal modulo the ring size, and the slots of
+    the days skipped over are zeroed when the ring advances, so old days
+    expire without ever being revisited.
+    """
+
+    __slots__ = ("chars", "day", "messages")
+
+    def __init__(self, day: int) -> None:
+        self.messages = [0] * _RING_SIZE
+        self.chars = [0] * _RING_SIZE
+        self.day = day
+
+    def advance(self, day: int) -> None:
+        for expired in range(self.day + 1, min(day, self.day + _RING_SIZE) + 1):
+            self.messages[expired % _RING_SIZE] = 0
+            self.chars[expired % _RING_SIZE] = 0
+        self.day = max(self.day, day)
+
+    def add(self, day: int, messages: int, chars: int) -> bool:
+        """Count activity of a day.
+
+        Returns:
+            bool: False if the day has already expired.
+        """
+        self.advance(day)
+        if day <= self.day - _RING_SIZE:
+            return False
+
+        self.messages[day % _RING_SIZE] += messages
+        self.chars[day % _RING_SIZE] += chars
+        return True
+
+    def total(self, today: int, days: int) -> tuple[int, int]:
+        """Messages and characters of the `days` days ending on `today`."""
+        first = max(today - days + 1, self.day - _RING_SIZE + 1)
+        last = min(today, self.day)
+        slots = [day % _RING_SIZE for day in range(first, last + 1)]
+        return (
+            sum(self.messages[slot] for slot in slots),
+            sum(self.chars[slot] for slot in slots),
+        )
+
+
+class LeaderboardWindows:
+    """Rolling-window leaderboards over the last `WINDOWS` days.
+
+    Every active user has a ring of daily counters, loaded from the day
+    buckets once and then fed by the ingestion path. Window totals are kept
+    ranked, so lookups never aggregate history; the rankings are only
+    recomputed when the day rolls over and a day expires from every window.
+    """
+
+    def __init__(self) -> None:
+        self._rings: dict[str, _DailyRing] = {}
+        self._ranks = {
+            (days, field): _OrderStatistic()
+            for days in WINDOWS
+            for field in ("message", "char")
+        }
+
+        self.today = datetime_now().date().toordinal()
+        self.loaded = False
+        self._generation = 0
+
+    async def load(self, buckets: Database) -> None:
+        start = perf_counter()
+
+        self._rings.clear()
+        self.today = datetime_now().date().toordinal()
+
+        first = date.fromordinal(self.today - _RING_SIZE + 1).isoformat()
+        for document in await buckets.find(
+            {"period": "day", "bucket": {"$gte": first}},
+            projection={"_id": 0, "user_id": 1, "bucket": 1, "message": 1, "char": 1},
+        ):
+            day = date.fromisoformat(document["bucket"]).toordinal()
+            self._count(
+                document["user_id"],
+                day,
+                document.get("message", 0),
+                document.get("char", 0),
+            )
+
+        self._rerank_all()
+        self.loaded = True
+        _logger.info(
+            "Loaded rolling windows for %s users in %.1fms",
+            len(self._rings),
+            (perf_counter() - start) * 1000,
+        )
+
+    def clear(self) -> None:
+        """Drop every counter, still counting what is added afterwards."""
+        self._rings.clear()
+        self._rerank_all()
+
+    @property
+    def generation(self) -> int:
+        """Bumped by every change, including a day expiring from the windows."""
+        self._roll()
+        return self._generation
+
+    def add(self, user_id: str, length: int, date: datetime) -> None:
+        if not self.loaded:
+            return
+
+        self._roll()
+        self._generation += 1
+        day = date.date().toordinal()
+        if self._count(user_id, day, 1, length):
+            self._rerank(user_id)
+
+    def apply(self, deltas: LeaderboardDeltas) -> None:
+        """Apply the day buckets of already-aggregated counters."""
+        if not self.loaded:
+            return
+
+        self._roll()
+        self._generation += 1
+        touched: set[str] = set()
+
+        for (user_id, period, bucket), delta in deltas.buckets.items():
+            if period != "day":
+                continue
+
+            day = date.fromisoformat(bucket).toordinal()
+            if self._count(user_id, day, delta["message"], delta["char"]):
+                touched.add(user_id)
+
+        for user_id in touched:
+            self._rerank(user_id)
+
+    def get(self, user_id: str, days: int, field: str) -> tuple[int, int] | None:
+        """A user's total and rank in a window, or None if they were inactive."""
+        self._roll()
+        ranks = self._ranks[days, field]
+        if (score := ranks.get(user_id)) is None:
+            return None
+        return score, ranks.rank(user_id) or 0
+
+    def top(
+        self,
+        days: int,
+        field: str,
+        limit: int,
+        after: tuple[int, str] | None = None,
+    ) -> list[tuple[str, int]]:
+        self._roll()
+        return self._ranks[days, field].top(limit, after)
+
+    def _count(self, user_id: str, day: int, messages: int, chars: int) -> bool:
+        if day <= self.today - _RING_SIZE:
+            return False
+
+        if (ring := self._rings.get(user_id)) is None:
+            ring = self._rings[user_id] = _DailyRing(day)
+        return ring.add(day, messages, chars)
+
+    def _roll(self) -> None:
+        today = datetime_now().date().toordinal()
+        if today > self.today:
+            self.today = today
+            self._rerank_all()
+
+    def _rerank_all(self) -> None:
+        self._generation += 1
+        for ranks in self._ranks.values():
+            ranks.clear()
+
+        for user_id in list(self._rings):
+            if self._rings[user_id].day <= self.today - _RING_SIZE:
+                del self._rings[user_id]
+            else:
+                self._rerank(user_id)
+
+    def _rerank(self, user_id: str) -> None:
+        ring = self._rings[user_id]
+        for days in WINDOWS:
+            messages, chars = ring.total(self.today, days)
+            for field, score in (("message", messages), ("char", chars)):
+                if messages:
+                    self._ranks[days, field].set(user_id, score)
+                else:
+                    self._ranks[days, field].discard(user_id)
@@ -1,9 +1,75 @@
 from datetime import datetime
-from typing import Any, Literal, Self
+from logging import getLogger
+from typing import Any, Literal, NamedTuple, Self
 
 from pydantic import BaseModel
+from pymongo import ASCENDING, DESCENDING, IndexModel
 
+from src._settings import config
+from src._utils import datetime_now
 from src.db._base import Database
+from src.db._leaderboard_buffer import LeaderboardDeltas, LeaderboardWriteBuffer
+from src.db._leaderboard_coverage import LeaderboardCoverage
+from src.db._leaderboard_index import LeaderboardRankIndex
+from src.db._leaderboard_ranking import LeaderboardRanker
+from src.db._leaderboard_windows import LeaderboardWindows
+
+_logger = getLogger("luk.leaderboard")
+
+Database.declare_indexes(
+    "leaderboard",
+    IndexModel([("user_id", ASCENDING)], unique=True),
+    IndexModel(
+        [("dirty", ASCENDING)],
+        partialFilterExpression={"dirty": True},
+    ),
+)
+Database.declare_indexes(
+    "leaderboard-ranked",
+    IndexModel([("user_id", ASCENDING)], unique=True),
+    IndexModel([("message", DESCENDING)]),
+    IndexModel([("char", DESCENDING)]),
+    # Pages are read by (rank, user_id) so ties split cleanly across pages.
+    IndexModel([("rank_message", ASCENDING), ("user_id", ASCENDING)]),
+    IndexModel([("rank_char", ASCENDING), ("user_id", ASCENDING)]),
+)
+Database.declare_indexes(
+    "leaderboard-buckets",
+    IndexModel(
+        [("user_id", ASCENDING), ("period", ASCENDING), ("bucket", ASCENDING)],
+        unique=True,
+    ),
+    IndexModel(
+        [("period", ASCENDING), ("bucket", ASCENDING), ("ranked_message", DESCENDING)],
+    ),
+    IndexModel(
+        [("period", ASCENDING), ("bucket", ASCENDING), ("ranked_char", DESCENDING)],
+    ),
+    IndexModel(
+        [
+            ("period", ASCENDING),
+            ("bucket", ASCENDING),
+            ("rank_message", ASCENDING),
+            ("user_id", ASCENDING),
+        ],
+    ),
+    IndexModel(
+        [
+            ("period", ASCENDING),
+            ("bucket", ASCENDING),
+            ("rank_char", ASCENDING),
+            ("user_id", ASCENDING),
+        ],
+    ),
+    IndexModel(
+        [("dirty", ASCENDING)],
+        partialFilterExpression={"dirty": True},
+    ),
+)
+Database.declare_indexes(
+    "leaderboard-coverage",
+    IndexModel([("channel_id", ASCENDING)], unique=True),
+)
 
 
 class MonthlyLeaderboardEntry(BaseModel):
@@ -13,6 +79,35 @@ class MonthlyLeaderboardEntry(BaseModel):
     rank_char: int
 
 
+class LeaderboardCursor(NamedTuple):
+    """The last entry of a leaderboard page, the next page starts after it."""
+
+    score: int
+    rank: int
+    user_id: str
+
+
+def _after_rank(field: str, cursor: LeaderboardCursor | None) -> dict[str, Any]:
+    """Filter for the entries ranked after the cursor, ties broken by user ID."""
+    if cursor is None:
+        return {field: {"$exists": True}}
+    return {
+        "$or": [
+            {field: {"$gt": cursor.rank}},
+            {field: cursor.rank, "user_id": {"$gt": cursor.user_id}},
+        ],
+    }
+
+
+class WindowLeaderboardEntry(BaseModel):
+    user_id: str
+    days: int
+    message: int
+    char: int
+    rank_message: int
+    rank_char: int
+
+
 class _LeaderboardRankedEntry(BaseModel):
     user_id: str
     message: int
@@ -21,6 +116,55 @@ class _LeaderboardRankedEntry(BaseModel):
     rank_char: int
     monthly: dict[str, MonthlyLeaderboardEntry]
 
+    @classmethod
+    def from_document(
+        cls,
+        data: dict[str, Any],
+        month: dict[str, Any] | None = None,
+    ) -> Self:
+        """Build an entry from trusted database data, skipping validation.
+
+        Args:
+            data (dict[str, Any]): The user's all-time ranked document.
+            month (dict[str, Any] | None): One of the user's month buckets.
+        """
+        return cls.model_construct(
+            user_id=data["user_id"],
+            message=data.get("message", 0),
+            char=data.get("char", 0),
+            rank_message=data.get("rank_message", 0),
+            rank_char=data.get("rank_char", 0),
+            monthly={
+                month["bucket"]: MonthlyLeaderboardEntry.model_construct(
+                    message=month.get("message", 0),
+                    char=month.get("char", 0),
+                    rank_message=month.get("rank_message", 0),
+                    rank_char=month.get("rank_char", 0),
+                ),
+            }
+            if month
+            else {},
+        )
+
+
+_RANKED_PROJECTION = {
+    "_id": 0,
+    "user_id": 1,
+    "message": 1,
+    "char": 1,
+    "rank_message": 1,
+    "rank_char": 1,
+}
+_BUCKET_PROJECTION = {
+    "_id": 0,
+    "user_id": 1,
+    "bucket": 1,
+    "message": 1,
+    "char": 1,
+    "rank_message": 1,
+    "rank_char": 1,
+}
+
 
 class LeaderboardDatabase:
     __instance: Self | None = None
@@ -32,49 +176,325 @@ class LeaderboardDatabase:
         return cls.__instance
 
     def __init__(self) -> None:
+        if hasattr(self, "_db"):
+            return
+
         self._db = Database("leaderboard")
-        self._view = Database("leaderboard-ranked")
+        self._ranked = Database("leaderboard-ranked")
+        self._buckets = Database("leaderboard-buckets")
+        self.coverage = LeaderboardCoverage(Database("leaderboard-coverage"))
+        self.buffer = LeaderboardWriteBuffer(
+            self._db,
+            self._buckets,
+            max_size=config.LEADERBOARD_FLUSH_SIZE,
+            interval=config.LEADERBOARD_FLUSH_INTERVAL,
+            # Coverage is persisted only once the counts it vouches for are.
+            coverage=self.coverage,
+        )
+        self.ranker = LeaderboardRanker(
+            self._db,
+            self._ranked,
+            self._buckets,
+            interval=config.LEADERBOARD_RANK_INTERVAL,
+        )
+        self.index = LeaderboardRankIndex()
+        self.windows = LeaderboardWindows()
+
+    async def start(self) -> None:
+        await self.ranker.setup()
+        if await self._migrate_monthly():
+            await self.ranker.rebuild()
+        if not await self.coverage.load():
+            await self._flag_uncovered_counts()
+        if config.LEADERBOARD_RANK_INDEX:
+            await self.index.load(self._db, self._buckets)
+        await self.windows.load(self._buckets)
+        self.buffer.start()
+        self.ranker.start()
+
+    async def stop(self) -> None:
+        await self.buffer.stop()
+        await self.ranker.stop()
+
+    async def _migrate_monthly(self) -> bool:
+        """Move the legacy embedded `monthly` map into month buckets.
+
+        Returns:
+            bool: True if anything was migrated.
+        """
+        legacy = {"monthly": {"$exists": True}}
+        if not await self._db.count_documents(legacy):
+            return False
+
+        _logger.info("Migrating monthly leaderboard counters to buckets")
+        # Replacing keeps the migration idempotent if it is interrupted.
+        await self._db.aggregate(
+            [
+                {"$match": legacy},
+                {
+                    "$project": {
+                        "_id": 0,
+                        "user_id": 1,
+                        "month": {"$objectToArray": "$monthly"},
+                    },
+                },
+                {"$unwind": "$month"},
+                {
+                    "$project": {
+                        "user_id": 1,
+                        "period": {"$literal": "month"},
+                        "bucket": "$month.k",
+                        "message": {"$ifNull": ["$month.v.message", 0]},
+                        "char": {"$ifNull": ["$month.v.char", 0]},
+                    },
+                },
+                {
+                    "$merge": {
+                        "into": self._buckets.name,
+                        "on": ["user_id", "period", "bucket"],
+                        "whenMatched": "replace",
+                        "whenNotMatched": "insert",
+                    },
+                },
+            ],
+        )
 
-    async def update_user(
+        for db in (self._db, self._ranked):
+            await db.update_many(legacy, {"$unset": {"monthly": ""}})
+        await self._ranked.drop_index("monthly.$**_1")
+        return True
+
+    async def _flag_uncovered_counts(self) -> None:
+        """Flag counters kept before coverage tracking as unreliable.
+
+        They hold live counts of messages no coverage vouches for, so a
+        backfill over them would count those messages twice. The flag is
+        only cleared by `reset_counts`.
+        """
+        if flagged := await self._db.update_many({}, {"$set": {"uncovered": True}}):
+            _logger.warning(
+                "%s leaderboard counters predate coverage tracking, the next "
+                "sync recounts the leaderboard from scratch",
+                flagged,
+            )
+
+    async def recount_required(self) -> bool:
+        """Whether counters predating coverage tracking are still stored."""
+        return bool(await self._db.count_documents({"uncovered": True}))
+
+    async def reset_counts(self) -> None:
+        """Drop every counter and all coverage, so history is counted afresh.
+
+        Live messages keep being counted meanwhile, into the new counters.
+        """
+        async with self.buffer.paused():
+            # Their messages lose their coverage and are counted again.
+            self.buffer.discard()
+            self.index.clear()
+            self.windows.clear()
+            await self.coverage.reset()
+
+            # The counters go last, they carry the flag requiring this reset.
+            for db in (self._buckets, self._ranked, self._db):
+                await db.delete_many({})
+
+        await self.ranker.rebuild()
+        _logger.info("Reset the leaderboard counters for a full recount")
+
+    def record_message(
         self,
         user_id: str,
         message: str,
         date: datetime,
+        *,
+        channel_id: int,
+        message_id: int,
+    ) -> bool:
+        """Queue a live message for the next buffered leaderboard write.
+
+        Returns:
+            bool: False if the message had already been counted.
+        """
+        if self.coverage.contains(channel_id, message_id):
+            return False
+
+        self.coverage.mark_live(channel_id, message_id)
+
+        length = len(message.strip())
+        self.buffer.add(user_id, length, date)
+        self.index.add(user_id, length, date)
+        self.windows.add(user_id, length, date)
+        return True
+
+    async def commit_backfill(
+        self,
+        channel_id: int,
+        deltas: LeaderboardDeltas,
+        start: int,
+        end: int,
     ) -> None:
-        await self._db.update_one(
-            {"user_id": user_id},
-            {
-                "$inc": {
-                    "message": 1,
-                    "char": len(message.strip()),
-                    f"monthly.{date.strftime('%Y-%m')}.message": 1,
-                    f"monthly.{date.strftime('%Y-%m')}.char": len(
-                        message.strip(),
-                    ),
-                },
-            },
-            upsert=True,
-        )
+        """Write a backfilled batch and mark `[start, end]` as counted.
+
+        The batch is flushed through the write buffer, so `[start, end]` is
+        saved with the same coverage snapshot as the counts it vouches for.
+        """
+        self.buffer.merge(deltas)
+        self.coverage.add(channel_id, start, end)
+        self.index.apply(deltas)
+        self.windows.apply(deltas)
+
+        await self.buffer.flush()
 
     async def set_leaderboard(self, leaderboard: list[dict[str, Any]]) -> None:
         await self._db.insert_many(leaderboard)
 
+    def _entry_from_index(self, user_id: str) -> _LeaderboardRankedEntry | None:
+        index = self.index
+        if (message := index.message.get(user_id)) is None:
+            return None
+
+        monthly: dict[str, MonthlyLeaderboardEntry] = {}
+        if (month_message := index.monthly_message.get(user_id)) is not None:
+            monthly[index.month] = MonthlyLeaderboardEntry.model_construct(
+                message=month_message,
+                char=index.monthly_char.get(user_id) or 0,
+                rank_message=index.monthly_message.rank(user_id) or 0,
+                rank_char=index.monthly_char.rank(user_id) or 0,
+            )
+
+        return _LeaderboardRankedEntry.model_construct(
+            user_id=user_id,
+            message=message,
+            char=index.char.get(user_id) or 0,
+            rank_message=index.message.rank(user_id) or 0,
+            rank_char=index.char.rank(user_id) or 0,
+            monthly=monthly,
+        )
+
     async def get_user(self, user_id: str) -> _LeaderboardRankedEntry | None:
-        if data := await self._view.find_one({"user_id": user_id}):
-            return _LeaderboardRankedEntry(**data)
+        if self.index.loaded:
+            return self._entry_from_index(user_id)
+
+        if data := await self._ranked.find_one(
+            {"user_id": user_id},
+            projection=_RANKED_PROJECTION,
+        ):
+            month = await self._buckets.find_one(
+                {
+                    "user_id": user_id,
+                    "period": "month",
+                    "bucket": datetime_now().strftime("%Y-%m"),
+                },
+                projection=_BUCKET_PROJECTION,
+            )
+            return _LeaderboardRankedEntry.from_document(data, month)
         return None
 
     async def get_top_users(
         self,
         limit: int = 10,
         _type: Literal["messages", "characters", "month"] = "messages",
+        *,
+        after: LeaderboardCursor | None = None,
     ) -> list[_LeaderboardRankedEntry]:
-        sort_key = "rank_" + ("message" if _type == "messages" else "char")
+        """Get a page of the leaderboard.
+
+        Args:
+            limit (int): The page size.
+            _type (str): What to rank by.
+            after (LeaderboardCursor | None): The last entry of the previous
+                page. Pages are range reads, so every page costs the same.
+        """
+        if self.index.loaded:
+            ordering = {
+                "messages": self.index.message,
+                "characters": self.index.char,
+                "month": self.index.monthly_message,
+            }[_type]
+            return [
+                entry
+                for user_id, _ in ordering.top(
+                    limit,
+                    (after.score, after.user_id) if after else None,
+                )
+                if (entry := self._entry_from_index(user_id))
+            ]
+
+        if _type == "month":
+            return await self._get_top_monthly(limit, after)
+
+        sort_key = "rank_message" if _type == "messages" else "rank_char"
         return [
-            _LeaderboardRankedEntry(**entry)
-            for entry in await self._view.find(
-                {},
-                sort=[(sort_key, 1)],
+            _LeaderboardRankedEntry.from_document(entry)
+            for entry in await self._ranked.find(
+                _after_rank(sort_key, after),
+                sort=[(sort_key, 1), ("user_id", 1)],
                 limit=limit,
+                projection=_RANKED_PROJECTION,
+            )
+        ]
+
+    async def _get_top_monthly(
+        self,
+        limit: int,
+        after: LeaderboardCursor | None,
+    ) -> list[_LeaderboardRankedEntry]:
+        months = await self._buckets.find(
+            {
+                "period": "month",
+                "bucket": datetime_now().strftime("%Y-%m"),
+                **_after_rank("rank_message", after),
+            },
+            sort=[("rank_message", 1), ("user_id", 1)],
+            limit=limit,
+            projection=_BUCKET_PROJECTION,
+        )
+        totals = {
+            entry["user_id"]: entry
+            for entry in await self._ranked.find(
+                {"user_id": {"$in": [month["user_id"] for month in months]}},
+                projection=_RANKED_PROJECTION,
+            )
+        }
+        return [
+            _LeaderboardRankedEntry.from_document(
+                totals.get(month["user_id"], {"user_id": month["user_id"]}),
+                month,
+            )
+            for month in months
+        ]
+
+    def get_window(self, user_id: str, days: int) -> WindowLeaderboardEntry | None:
+        """A user's stats over the last `days` days."""
+        if (message := self.windows.get(user_id, days, "message")) is None:
+            return None
+
+        char, rank_char = self.windows.get(user_id, days, "char") or (0, 0)
+        return WindowLeaderboardEntry.model_construct(
+            user_id=user_id,
+            days=days,
+            message=message[0],
+            char=char,
+            rank_message=message[1],
+            rank_char=rank_char,
+        )
+
+    def get_top_window(
+        self,
+        days: int,
+        limit: int = 10,
+        _type: Literal["messages", "characters"] = "messages",
+        *,
+        after: LeaderboardCursor | None = None,
+    ) -> list[WindowLeaderboardEntry]:
+        field = "message" if _type == "messages" else "char"
+        return [
+            entry
+            for user_id, _ in self.windows.top(
+                days,
+                field,
+                limit,
+                (after.score, after.user_id) if after else None,
             )
+            if (entry := self.get_window(user_id, days))
         ]
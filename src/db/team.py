@@ -0,0 +1,170 @@
+from datetime import datetime
+from typing import Any, Self
+
+from pydantic import BaseModel
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import DuplicateKeyError
+
+from src._constants import TeamPreset
+from src.db._base import Database
+
+Database.declare_indexes(
+    "team-groups",
+    IndexModel([("message_id", ASCENDING)], unique=True),
+    IndexModel([("remind_at", ASCENDING)], sparse=True),
+    IndexModel([("time", ASCENDING)]),
+    IndexModel([("preset", ASCENDING), ("time", ASCENDING)]),
+    IndexModel(
+        [("time", ASCENDING)],
+        name="time_1_free_tank",
+        partialFilterExpression={"free.tank": {"$gt": 0}},
+    ),
+)
+
+
+class TeamGroupSummary(BaseModel):
+    message_id: int
+    name: str
+    time: datetime
+    owner_id: int
+    preset: TeamPreset | None = None
+    roles: list[str]
+    # Members that are not just helping, and the limit, of each role.
+    filled: dict[str, int]
+    limits: dict[str, float]
+
+    @classmethod
+    def from_document(cls, data: dict[str, Any]) -> "TeamGroupSummary":
+        return cls(
+            message_id=data["message_id"],
+            name=data["name"],
+            time=data["time"],
+            owner_id=data["owner"]["id"],
+            preset=data.get("preset"),
+            roles=data["roles"],
+            # Groups are summarized from their next save on.
+            filled=data.get("filled", dict.fromkeys(data["roles"], 0)),
+            limits=dict(zip(data["roles"], data["limits"], strict=True)),
+        )
+
+
+class TeamGroupDatabase:
+    """System of record for team groups, keyed by their message ID.
+
+    Every saved state carries a revision, and a save only replaces an older
+    one, so concurrent writers can never roll a group back.
+    """
+
+    __instance: Self | None = None
+
+    def __new__(cls) -> Self:
+        if cls.__instance is None:
+            cls.__instance = super().__new__(cls)
+
+        return cls.__instance
+
+    def __init__(self) -> None:
+        if hasattr(self, "_db"):
+            return
+
+        self._db = Database("team-groups", tz_aware=True)
+
+    async def get(self, message_id: int) -> dict[str, Any] | None:
+        return await self._db.find_one(
+            {"message_id": message_id},
+            projection={"_id": 0},
+        )
+
+    async def save(self, message_id: int, revision: int, data: dict[str, Any]) -> None:
+        try:
+            await self._db.update_one(
+                {"message_id": message_id, "revision": {"$lt": revision}},
+                {"$set": {**data, "revision": revision}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            # A newer revision is already stored.
+            return
+
+    async def delete(self, message_id: int) -> None:
+        await self._db.delete_one({"message_id": message_id})
+
+    async def upcoming_reminders(self, after: datetime) -> list[dict[str, Any]]:
+        return await self._db.find(
+            {"remind_at": {"$gte": after}},
+            projection={"_id": 0, "message_id": 1, "remind_at": 1},
+        )
+
+    async def set_reminder(self, message_id: int, at: datetime) -> None:
+        await self._db.update_one(
+            {"message_id": message_id},
+            {"$set": {"remind_at": at}},
+        )
+
+    async def clear_reminder(self, message_id: int) -> None:
+        await self._db.update_one(
+            {"message_id": message_id},
+            {"$unset": {"remind_at": ""}},
+        )
+
+    async def started_before(self, before: datetime, limit: int) -> list[int]:
+        """Get the message IDs of the groups that started before a time.
+
+        Returns:
+            list[int]: Up to `limit` message IDs, earliest start first.
+        """
+        documents = await self._db.find(
+            {"time": {"$lt": before}},
+            sort=[("time", ASCENDING)],
+            limit=limit,
+            projection={"_id": 0, "message_id": 1},
+        )
+        return [document["message_id"] for document in documents]
+
+    async def find_active(
+        self,
+        *,
+        start: datetime,
+        end: datetime | None = None,
+        preset: TeamPreset | None = None,
+        free_tank: bool = False,
+        limit: int = 25,
+    ) -> list[TeamGroupSummary]:
+        """Get the groups starting in a time window, earliest first.
+
+        Args:
+            start (datetime): The earliest start time.
+            end (datetime | None): The start time to stop before, if any.
+            preset (TeamPreset | None): Only groups created from this preset.
+            free_tank (bool): Only groups with a free tank slot.
+            limit (int): The maximum number of groups.
+
+        Returns:
+            list[TeamGroupSummary]: The matching groups.
+        """
+        query: dict[str, Any] = {"time": {"$gte": start}}
+        if end is not None:
+            query["time"]["$lt"] = end
+        if preset is not None:
+            query["preset"] = preset
+        if free_tank:
+            # Matches the partial time index.
+            query["free.tank"] = {"$gt": 0}
+
+        documents = await self._db.find(
+            query,
+            sort=[("time", ASCENDING)],
+            limit=limit,
+            projection={
+                "_id": 0,
+                "message_id": 1,
+                "name": 1,
+                "time": 1,
+                "owner.id": 1,
+                "preset": 1,
+                "filled": 1,
+                "roles": 1,
+                "limits": 1,
+            },
+        )
+        return [TeamGroupSummary.from_document(document) for document in documents]
@@ -0,0 +1,331 @@
+import base64
+import binascii
+import json
+import struct
+import zlib
+from datetime import UTC, datetime, timedelta, timezone
+from typing import Any
+
+from src._emojis import LukEmojis
+
+# Version 1 payloads are zlib-compressed pydantic JSON of groups from before
+# role-indexed lists, with a limit and member list field per role and no
+# waitlists. They are only decoded. Version 2 is a compact binary layout:
+# fixed-width IDs, varint counts, an epoch timestamp, role keys and emojis as
+# small integer codes, and raw deflate primed with the strings every payload
+# repeats. It starts with its version byte where version 1 starts with a zlib
+# header, so both decode transparently.
+_VERSION = 2
+
+# Role strings by code. Only ever append, codes are part of the format.
+_ROLES = [
+    str(emoji)
+    for emoji in (
+        LukEmojis.sb,
+        LukEmojis.fm,
+        LukEmojis.wk,
+        LukEmojis.mm,
+        LukEmojis.vo,
+        LukEmojis.bp,
+        LukEmojis.sk,
+        LukEmojis.hg,
+    )
+]
+_ROLE_CODES = {role: code for code, role in enumerate(_ROLES)}
+_RAW_ROLE = 0xFF
+
+# Role keys by code, the same way.
+_ROLE_KEYS = ["dps", "healer", "tank"]
+_ROLE_KEY_CODES = {key: code for code, key in enumerate(_ROLE_KEYS)}
+
+# The roles every version 1 payload has.
+_LEGACY_ROLES = ("dps", "healer", "tank")
+_IMAGINES = ("airona", "tina", "basilisk")
+
+_HELP = 0b0001
+_NAIVE_TIME = 0b0001
+
+# Snowflakes take 8 bytes fixed, a varint would need 9.
+_SNOWFLAKE = struct.Struct("<Q")
+_DOUBLE = struct.Struct("<d")
+
+# Limits are varints: no limit, a double that follows, or the limit plus two.
+_NO_LIMIT = 0
+_RAW_LIMIT = 1
+
+_ZDICT = (
+    b"https://cdn.discordapp.com/embed/avatars/"
+    b".png?size=1024.webp?size=1024.gif?size=1024"
+    b"https://cdn.discordapp.com/avatars/"
+    b"https://cdn.discordapp.com/guilds/"
+)
+
+
+class _Writer:
+    __slots__ = ("buffer",)
+
+    def __init__(self) -> None:
+        self.buffer = bytearray()
+
+    def snowflake(self, value: int) -> None:
+        self.buffer += _SNOWFLAKE.pack(value)
+
+    def double(self, value: float) -> None:
+        self.buffer += _DOUBLE.pack(value)
+
+    def varint(self, value: int) -> None:
+        while value > 0x7F:  # noqa: PLR2004
+            self.buffer.append((value & 0x7F) | 0x80)
+            value >>= 7
+        self.buffer.append(value)
+
+    def zigzag(self, value: int) -> None:
+        self.varint(value << 1 if value >= 0 else (-value << 1) - 1)
+
+    def text(self, value: str) -> None:
+        encoded = value.encode()
+        self.varint(len(encoded))
+        self.buffer += encoded
+
+
+class _Reader:
+    __slots__ = ("data", "offset")
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.offset = 0
+
+    def byte(self) -> int:
+        self.offset += 1
+        return self.data[self.offset - 1]
+
+    def snowflake(self) -> int:
+        self.offset += 8
+        return _SNOWFLAKE.unpack_from(self.data, self.offset - 8)[0]
+
+    def double(self) -> float:
+        self.offset += 8
+        return _DOUBLE.unpack_from(self.data, self.offset - 8)[0]
+
+    def varint(self) -> int:
+        value = self.data[self.offset]
+        if value < 0x80:  # noqa: PLR2004
+            self.offset += 1
+            return value
+
+        value = shift = 0
+        while True:
+            byte = self.byte()
+            value |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                return value
+            shift += 7
+
+    def zigzag(self) -> int:
+        value = self.varint()
+        return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+    def raw(self, length: int) -> bytes:
+        self.offset += length
+        return self.data[self.offset - length : self.offset]
+
+    def text(self) -> str:
+        return self.raw(self.varint()).decode()
+
+
+def _from_legacy(data: object) -> dict[str, Any]:
+    """Turn a version 1 payload into role-indexed group data.
+
+    Raises:
+        TypeError: If the payload is not a JSON object.
+    """
+    if not isinstance(data, dict):
+        msg = "Version 1 payloads are JSON objects."
+        raise TypeError(msg)
+
+    fields = {
+        f"{role}_{field}" for role in _LEGACY_ROLES for field in ("limit", "members")
+    }
+    return {key: value for key, value in data.items() if key not in fields} | {
+        "roles": list(_LEGACY_ROLES),
+        "limits": [data[f"{role}_limit"] for role in _LEGACY_ROLES],
+        "members": [data.get(f"{role}_members", []) for role in _LEGACY_ROLES],
+        "waitlists": [[] for _ in _LEGACY_ROLES],
+    }
+
+
+def _pack(data: dict[str, Any]) -> bytes:
+    writer = _Writer()
+
+    owner = data["owner"]
+    writer.snowflake(owner["id"])
+    writer.text(owner["name"])
+    writer.text(owner["icon_url"])
+
+    writer.text(data["name"])
+    # 0 is no description, otherwise its length plus one.
+    if data["desc"] is None:
+        writer.varint(0)
+    else:
+        encoded = data["desc"].encode()
+        writer.varint(len(encoded) + 1)
+        writer.buffer += encoded
+
+    time: datetime = data["time"]
+    offset = time.utcoffset()
+    writer.varint(_NAIVE_TIME if offset is None else 0)
+    writer.zigzag(int(time.replace(tzinfo=time.tzinfo or UTC).timestamp()))
+    writer.zigzag(int(offset.total_seconds()) // 60 if offset else 0)
+
+    writer.varint(len(data["roles"]))
+    for role, limit, members, waitlist in zip(
+        data["roles"],
+        data["limits"],
+        data["members"],
+        data["waitlists"],
+        strict=True,
+    ):
+        if (code := _ROLE_KEY_CODES.get(role)) is not None:
+            writer.buffer.append(code)
+        else:
+            writer.buffer.append(_RAW_ROLE)
+            writer.text(role)
+        _pack_limit(writer, limit)
+        _pack_members(writer, members)
+        _pack_members(writer, waitlist)
+
+    return bytes(writer.buffer)
+
+
+def _pack_limit(writer: _Writer, limit: float) -> None:
+    if limit == float("inf"):
+        writer.varint(_NO_LIMIT)
+    elif limit >= 0 and float(limit).is_integer():
+        writer.varint(int(limit) + 2)
+    else:
+        writer.varint(_RAW_LIMIT)
+        writer.double(limit)
+
+
+def _pack_members(writer: _Writer, members: list[dict[str, Any]]) -> None:
+    writer.varint(len(members))
+    for member in members:
+        writer.snowflake(member["id"])
+
+        if (code := _ROLE_CODES.get(member["role"])) is not None:
+            writer.buffer.append(code)
+        else:
+            writer.buffer.append(_RAW_ROLE)
+            writer.text(member["role"])
+
+        flags = _HELP if member["help"] else 0
+        for bit, imagine in enumerate(_IMAGINES, start=1):
+            if member[imagine] is not None:
+                flags |= 1 << bit
+        writer.buffer.append(flags)
+
+        for imagine in _IMAGINES:
+            if member[imagine] is not None:
+                writer.varint(member[imagine])
+
+
+def _unpack(body: bytes) -> dict[str, Any]:
+    reader = _Reader(body)
+
+    owner = {"id": reader.snowflake(), "name": reader.text(), "icon_url": reader.text()}
+    name = reader.text()
+
+    desc = None
+    if desc_length := reader.varint():
+        desc = reader.raw(desc_length - 1).decode()
+
+    naive = reader.varint() & _NAIVE_TIME
+    timestamp = reader.zigzag()
+    offset = timedelta(minutes=reader.zigzag())
+    time = datetime.fromtimestamp(timestamp, tz=timezone(offset))
+    if naive:
+        time = time.replace(tzinfo=None)
+
+    data: dict[str, Any] = {
+        "name": name,
+        "time": time,
+        "desc": desc,
+        "owner": owner,
+        "roles": [],
+        "limits": [],
+        "members": [],
+        "waitlists": [],
+    }
+    for _ in range(reader.varint()):
+        code = reader.byte()
+        data["roles"].append(reader.text() if code == _RAW_ROLE else _ROLE_KEYS[code])
+        data["limits"].append(_unpack_limit(reader))
+        data["members"].append(_unpack_members(reader))
+        data["waitlists"].append(_unpack_members(reader))
+
+    return data
+
+
+def _unpack_limit(reader: _Reader) -> float:
+    value = reader.varint()
+    if value == _NO_LIMIT:
+        return float("inf")
+    if value == _RAW_LIMIT:
+        return reader.double()
+    return float(value - 2)
+
+
+def _unpack_members(reader: _Reader) -> list[dict[str, Any]]:
+    members: list[dict[str, Any]] = []
+    for _ in range(reader.varint()):
+        member_id = reader.snowflake()
+        code = reader.byte()
+        role = reader.text() if code == _RAW_ROLE else _ROLES[code]
+        flags = reader.byte()
+
+        members.append(
+            {
+                "id": member_id,
+                "role": role,
+                "help": bool(flags & _HELP),
+                **{
+                    imagine: reader.varint() if flags & (1 << bit) else None
+                    for bit, imagine in enumerate(_IMAGINES, start=1)
+                },
+            },
+        )
+
+    return members
+
+
+def encode_group_data(data: dict[str, Any]) -> str:
+    """Encode `_GroupData.model_dump()` output as a URL-safe payload."""
+    compressor = zlib.compressobj(level=6, wbits=-15, zdict=_ZDICT)
+    raw = bytes([_VERSION]) + compressor.compress(_pack(data)) + compressor.flush()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_group_data(payload: str) -> dict[str, Any]:
+    """Decode a payload of any version into `_GroupData` input.
+
+    Raises:
+        ValueError: If the payload is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+        if raw[0] == _VERSION:
+            decompressor = zlib.decompressobj(wbits=-15, zdict=_ZDICT)
+            return _unpack(decompressor.decompress(raw[1:]) + decompressor.flush())
+
+        return _from_legacy(json.loads(zlib.decompress(raw)))
+    except (
+        IndexError,
+        KeyError,
+        TypeError,
+        UnicodeDecodeError,
+        binascii.Error,
+        struct.error,
+        zlib.error,
+    ) as exc:
+        msg = "Malformed team group payload."
+        raise ValueError(msg) from exc
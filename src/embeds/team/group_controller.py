@@ -1,19 +1,41 @@
-import base64
-import zlib
+import asyncio
+from collections import OrderedDict, deque
+from collections.abc import Iterable, Iterator, Sequence
 from datetime import datetime
+from itertools import chain
+from typing import Annotated, Any, Self
+from weakref import WeakValueDictionary
 
 from cachetools import TTLCache
 from discord import Embed, Member, PartialEmoji, User
 from discord.utils import format_dt
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, WrapSerializer, field_validator, model_validator
 
 from src._colors import LukColors
+from src._constants import TeamPreset
 from src._emojis import LukEmojis
+from src._team import DEFAULT_SCHEMA, TeamSchema, schema_for
+from src._utils import chunk_lines
+from src.db.team import TeamGroupDatabase
+from src.embeds.team._group_codec import decode_group_data, encode_group_data
 
 _INTERNAL_CACHE: TTLCache[int, "GroupEmbedController"] = TTLCache(
     maxsize=1024,
     ttl=60 * 60 * 3,
 )
+_GROUP_LOCKS: WeakValueDictionary[int, asyncio.Lock] = WeakValueDictionary()
+
+
+def group_lock(message_id: int) -> asyncio.Lock:
+    """Get the lock serializing the changes and edits of a group message.
+
+    A change and the message edit that publishes it must happen under the
+    lock, otherwise a slower edit can overwrite a newer embed. Locks are
+    dropped once nobody holds or waits for them.
+    """
+    if (lock := _GROUP_LOCKS.get(message_id)) is None:
+        lock = _GROUP_LOCKS[message_id] = asyncio.Lock()
+    return lock
 
 
 class _GroupUser(BaseModel):
@@ -25,6 +47,13 @@ class _GroupUser(BaseModel):
     basilisk: int | None = None
 
 
+# Waitlists are queues in memory, but stored and encoded as plain lists.
+type _Waitlist = Annotated[
+    deque[_GroupUser],
+    WrapSerializer(lambda value, handler: list(handler(value))),
+]
+
+
 class _GroupOwner(BaseModel):
     id: int
     name: str
@@ -36,22 +65,37 @@ class _GroupData(BaseModel):
     time: datetime
     desc: str | None
 
-    dps_limit: float
-    healer_limit: float
-    tank_limit: float
-
-    dps_members: list[_GroupUser] = []
-    healer_members: list[_GroupUser] = []
-    tank_members: list[_GroupUser] = []
+    # Role keys in field order, the lists below are indexed alike.
+    roles: list[str]
+    limits: list[float]
+    # Members and waitlists are kept by the controller's role slots, and
+    # only written back here when the data is saved or encoded.
+    members: list[list[_GroupUser]]
+    # Members who joined a full role, in the order they joined.
+    waitlists: list[_Waitlist]
 
     owner: _GroupOwner
 
-    @field_validator("dps_limit", "healer_limit", "tank_limit", mode="before")
+    @field_validator("limits", mode="before")
     @classmethod
-    def _validate_limits(cls, v: float | str | None) -> float:
-        if (isinstance(v, str) and v.lower() == "inf") or v is None:
-            return float("inf")
-        return float(v)
+    def _validate_limits(cls, v: list[float | str | None]) -> list[float]:
+        return [
+            float("inf")
+            if (isinstance(limit, str) and limit.lower() == "inf") or limit is None
+            else float(limit)
+            for limit in v
+        ]
+
+    @model_validator(mode="after")
+    def _validate_roles(self) -> Self:
+        if not (
+            len(self.roles)
+            == len(self.limits)
+            == len(self.members)
+            == len(self.waitlists)
+        ):
+            raise ValueError("Every role needs a limit, members and a waitlist.")
+        return self
 
 
 IMAGINE_EMOJIS = {
@@ -82,24 +126,59 @@ IMAGINE_EMOJIS = {
 }
 
 
+class _RoleSlots:
+    """The members of one role, keyed by ID in the order they joined.
+
+    Joining, leaving, promotion and help toggles are O(1). The member list
+    is the regular members followed by the helpers, who take no slot.
+    """
+
+    __slots__ = ("helpers", "regular", "waitlist")
+
+    def __init__(
+        self,
+        members: Iterable[_GroupUser] = (),
+        waitlist: Iterable[_GroupUser] = (),
+    ) -> None:
+        self.regular: OrderedDict[int, _GroupUser] = OrderedDict()
+        self.helpers: OrderedDict[int, _GroupUser] = OrderedDict()
+        self.waitlist = OrderedDict((user.id, user) for user in waitlist)
+
+        for user in members:
+            (self.helpers if user.help else self.regular)[user.id] = user
+
+    def members(self) -> list[_GroupUser]:
+        return [*self.regular.values(), *self.helpers.values()]
+
+
+# Discord's limits on embeds and messages.
+_FIELD_CHARS = 1024
+_EMBED_FIELDS = 25
+_EMBED_CHARS = 6000
+_MESSAGE_CHARS = 2000
+
+_OVERFLOW_NOTE = "Not every member fits here, use List team for the full list."
+
+
 class GroupEmbedController:
     def __init__(  # noqa: PLR0913
         self,
         name: str,
         time: datetime,
         desc: str | None,
-        dps_limit: float,
-        healer_limit: float,
-        tank_limit: float,
+        limits: Sequence[float],
         owner: Member | User | _GroupOwner,
+        schema: TeamSchema = DEFAULT_SCHEMA,
     ) -> None:
+        self.schema = schema
         self.data: _GroupData = _GroupData(
             name=name,
             time=time,
             desc=desc,
-            dps_limit=dps_limit,
-            healer_limit=healer_limit,
-            tank_limit=tank_limit,
+            roles=list(schema.keys),
+            limits=list(limits),
+            members=[[] for _ in schema.roles],
+            waitlists=[deque() for _ in schema.roles],
             owner=_GroupOwner(
                 id=owner.id,
                 name=owner.name,
@@ -109,26 +188,64 @@ class GroupEmbedController:
             ),
         )
         self._embed: Embed | None = None
+        # Rendered fields of each role section by role index, and the ones
+        # out of date.
+        self._fields: dict[int, list[tuple[str, str]]] = {}
+        self._dirty: set[int] = set(range(len(schema.roles)))
+        self.revision = 0
+        # The preset the group was created from, unknown for imported groups.
+        self.preset: TeamPreset | None = None
+
+        self._roles = [_RoleSlots() for _ in schema.roles]
+        # Member ID to its role index, entry and whether it waits, kept in
+        # step with the role slots.
+        self._slots: dict[int, tuple[int, _GroupUser, bool]] = {}
+        # Members promoted from a waitlist and not told yet.
+        self._promoted: list[int] = []
+
+    def _dump(self) -> dict[str, Any]:
+        self.data.members = [role.members() for role in self._roles]
+        self.data.waitlists = [deque(role.waitlist.values()) for role in self._roles]
+        return self.data.model_dump()
 
     def _encode_data(self) -> str:
-        return base64.urlsafe_b64encode(
-            zlib.compress(
-                self.data.model_dump_json().encode(),
-                level=9,
-            ),
-        ).decode()
-
-    @classmethod
-    def _decode_data(cls, data_str: str) -> bytes:
-        return zlib.decompress(base64.urlsafe_b64decode(data_str))
+        return encode_group_data(self._dump())
 
     @property
     def embed(self) -> Embed:
+        """The group embed, re-rendering only the role sections that changed.
+
+        The payload in the author URL is encoded here too, so a burst of
+        changes costs one encode when the embed is sent.
+        """
         if self._embed is None:
             self._embed = self._create_embed()
+            self._dirty.update(range(len(self.schema.roles)))
+
+        if self._dirty:
+            for index in self._dirty:
+                self._fields[index] = self._render_section(index)
+            self._dirty.clear()
+            self._fill_fields(self._embed)
+
+            self._embed.set_author(
+                name=self.data.owner.name,
+                icon_url=self.data.owner.icon_url,
+                url=f"https://luk.gg/bpsr?data={self._encode_data()}",
+            )
 
         return self._embed
 
+    def invalidate(self) -> None:
+        """Render the embed again after `data` was changed directly.
+
+        Only the name, description, time and limits may be changed so.
+        """
+        self._embed = None
+        # Limits may have been raised.
+        for index in range(len(self._roles)):
+            self._promote(index)
+
     def _create_embed(self) -> Embed:
         embed = Embed(
             title=self.data.name,
@@ -142,60 +259,78 @@ class GroupEmbedController:
         if self.data.desc and embed.description:
             embed.description += self.data.desc
 
-        dps_limit = (
-            int(self.data.dps_limit) if self.data.dps_limit != float("inf") else None
-        )
-        embed.add_field(
-            name=(
-                f"{LukEmojis.dps} Damage ({len(self.data.dps_members)}"
-                f"{f'/{dps_limit}' if dps_limit is not None else ''})"
-            ),
-            value=self.update_members(self.data.dps_members, limit=dps_limit),
-            inline=False,
-        )
+        return embed
 
-        healer_limit = (
-            int(self.data.healer_limit)
-            if self.data.healer_limit != float("inf")
-            else None
+    def _fill_fields(self, embed: Embed) -> None:
+        """Lay the rendered role sections out within the embed limits.
+
+        The first field of every section is always shown. Continuation
+        fields of long sections are dropped, with a note, once the embed
+        runs out of fields or characters.
+        """
+        embed.clear_fields()
+        embed.remove_footer()
+
+        budget = (
+            _EMBED_CHARS
+            - len(embed.title or "")
+            - len(embed.description or "")
+            - len(self.data.owner.name)
+            - len(_OVERFLOW_NOTE)
+            - sum(len(name) + len(value) for name, value in self._first_fields())
         )
-        embed.add_field(
-            name=(
-                f"{LukEmojis.sup} Support ({len(self.data.healer_members)}"
-                f"{f'/{healer_limit}' if healer_limit is not None else ''})"
-            ),
-            value=self.update_members(self.data.healer_members, limit=healer_limit),
-            inline=False,
+        spare_fields = _EMBED_FIELDS - len(self.schema.roles)
+        truncated = False
+
+        for index in range(len(self.schema.roles)):
+            (name, value), *continuation = self._fields[index]
+            embed.add_field(name=name, value=value, inline=False)
+
+            for name, value in continuation:
+                size = len(name) + len(value)
+                if not spare_fields or size > budget:
+                    truncated = True
+                    break
+
+                embed.add_field(name=name, value=value, inline=False)
+                budget -= size
+                spare_fields -= 1
+
+        if truncated:
+            embed.set_footer(text=_OVERFLOW_NOTE)
+
+    def _first_fields(self) -> Iterator[tuple[str, str]]:
+        for index in range(len(self.schema.roles)):
+            yield self._fields[index][0]
+
+    def _render_section(self, index: int) -> list[tuple[str, str]]:
+        role = self.schema.roles[index]
+        members = self._roles[index].members()
+        waitlist = self._roles[index].waitlist.values()
+        limit = self.data.limits[index]
+
+        shown_limit = int(limit) if limit != float("inf") else None
+        name = (
+            f"{role.emoji} {role.label} ({len(members)}"
+            f"{f'/{shown_limit}' if shown_limit is not None else ''}"
+            f"{f', {len(waitlist)} waiting' if waitlist else ''})"
         )
-
-        tank_limit = (
-            int(self.data.tank_limit) if self.data.tank_limit != float("inf") else None
-        )
-        embed.add_field(
-            name=(
-                f"{LukEmojis.tank} Tank ({len(self.data.tank_members)}"
-                f"{f'/{tank_limit}' if tank_limit is not None else ''})"
+        values = chunk_lines(
+            chain(
+                self._member_lines(members, limit=shown_limit),
+                self._member_lines(waitlist, limit=0),
             ),
-            value=self.update_members(self.data.tank_members, limit=tank_limit),
-            inline=False,
-        )
-
-        embed.set_author(
-            name=self.data.owner.name,
-            icon_url=self.data.owner.icon_url,
-            url=f"https://luk.gg/bpsr?data={self._encode_data()}",
-        )
-
-        return embed
-
-    def update_members(self, members: list[_GroupUser], limit: float | None) -> str:
-        if not members:
-            return "\u200b"
-
-        members.sort(key=lambda m: m.help)
+            _FIELD_CHARS,
+        ) or ["\u200b"]
+        return [(name, values[0]), *(("\u200b", value) for value in values[1:])]
 
-        return "\n".join(
-            (
+    def _member_lines(
+        self,
+        members: Iterable[_GroupUser],
+        limit: float | None,
+    ) -> Iterator[str]:
+        for index, member in enumerate(members):
+            yield (
                 f"{member.role} <@{member.id}> "
                 f"{'' if (member.airona is None) else f'A {member.airona}★'} "
                 f"{'' if (member.tina is None) else f'T {member.tina}★'} "
@@ -204,13 +339,12 @@ class GroupEmbedController:
                 f"{
                     (
                         LukEmojis.alert
-                        if index >= (limit or float('inf')) and not member.help
+                        if index >= (float('inf') if limit is None else limit)
+                        and not member.help
                         else ''
                     )
                 }"
             )
-            for index, member in enumerate(members)
-        )
 
     @classmethod
     def from_message(
@@ -226,29 +360,162 @@ class GroupEmbedController:
         if not embed.author:
             raise ValueError("Embed does not have an author.")
 
-        _data = _GroupData.model_validate_json(
-            cls._decode_data(str(embed.author.url).split("data=")[1]),
+        controller = cls._from_data(
+            _GroupData.model_validate(
+                decode_group_data(str(embed.author.url).split("data=")[1]),
+            ),
         )
+
+        _INTERNAL_CACHE[message_id] = controller
+
+        return controller
+
+    @classmethod
+    async def get(
+        cls,
+        message_id: int,
+        embed: Embed | None = None,
+    ) -> "GroupEmbedController":
+        """Get a group through the cache from the team group store.
+
+        Groups posted before the store existed are imported from their embed
+        once and saved.
+
+        Raises:
+            ValueError: If the group is not stored and no embed was given.
+        """
+        if (controller := _INTERNAL_CACHE.get(message_id)) is not None:
+            return controller
+
+        async with group_lock(message_id):
+            # Another interaction may have loaded it while this one waited.
+            if (controller := _INTERNAL_CACHE.get(message_id)) is not None:
+                return controller
+
+            if (document := await TeamGroupDatabase().get(message_id)) is not None:
+                controller = cls._from_data(_GroupData.model_validate(document))
+                controller.revision = document["revision"]
+                if (preset := document.get("preset")) is not None:
+                    controller.preset = TeamPreset(preset)
+                _INTERNAL_CACHE[message_id] = controller
+                return controller
+
+            if embed is None:
+                raise ValueError("Unknown team group.")
+
+            controller = cls.from_message(embed, message_id, no_cache=True)
+
+        await controller.save(message_id)
+        return controller
+
+    async def save(self, message_id: int) -> None:
+        """Write the group through the cache to the team group store."""
+        self.revision += 1
+        _INTERNAL_CACHE[message_id] = self
+        await TeamGroupDatabase().save(
+            message_id,
+            self.revision,
+            self._dump() | self._summary(),
+        )
+
+    def _summary(self) -> dict[str, Any]:
+        """Fields that let the store filter groups without decoding members."""
+        filled = [len(role.regular) for role in self._roles]
+        return {
+            "preset": self.preset,
+            "filled": dict(zip(self.data.roles, filled, strict=True)),
+            "free": {
+                role: max(limit - count, 0)
+                for role, limit, count in zip(
+                    self.data.roles,
+                    self.data.limits,
+                    filled,
+                    strict=True,
+                )
+            },
+        }
+
+    @classmethod
+    async def discard(cls, message_id: int) -> None:
+        _INTERNAL_CACHE.pop(message_id, None)
+        await TeamGroupDatabase().delete(message_id)
+
+    @classmethod
+    def _from_data(cls, _data: _GroupData) -> "GroupEmbedController":
         controller = cls(
             name=_data.name,
             time=_data.time,
             desc=_data.desc,
-            dps_limit=_data.dps_limit,
-            healer_limit=_data.healer_limit,
-            tank_limit=_data.tank_limit,
+            limits=_data.limits,
             owner=_GroupOwner(
                 id=_data.owner.id,
                 name=_data.owner.name,
                 icon_url=_data.owner.icon_url,
             ),
+            schema=schema_for(tuple(_data.roles)),
         )
         controller.data = _data
-
-        _INTERNAL_CACHE[message_id] = controller
-
+        controller._reindex()
         return controller
 
+    def _reindex(self) -> None:
+        self._roles = [
+            _RoleSlots(members, waitlist)
+            for members, waitlist in zip(
+                self.data.members,
+                self.data.waitlists,
+                strict=True,
+            )
+        ]
+        self._slots = {}
+        for index, role in enumerate(self._roles):
+            for user in role.members():
+                self._slots[user.id] = (index, user, False)
+            for user in role.waitlist.values():
+                self._slots[user.id] = (index, user, True)
+
+        # Limits may have been raised.
+        for index in range(len(self._roles)):
+            self._promote(index)
+
+    def _has_room(self, index: int) -> bool:
+        # Helpers do not take a slot.
+        return len(self._roles[index].regular) < self.data.limits[index]
+
+    def _promote(self, index: int) -> None:
+        """Move waitlisted members of a role into its free slots."""
+        role = self._roles[index]
+        while role.waitlist and self._has_room(index):
+            _, user = role.waitlist.popitem(last=False)
+            role.regular[user.id] = user
+            self._slots[user.id] = (index, user, False)
+            self._promoted.append(user.id)
+            self._dirty.add(index)
+
+    def take_promoted(self) -> list[int]:
+        """Get the members promoted from a waitlist since the last call.
+
+        Returns:
+            list[int]: The IDs of the promoted members still in the group.
+        """
+        promoted, self._promoted = self._promoted, []
+        return [
+            user_id
+            for user_id in dict.fromkeys(promoted)
+            if (slot := self._slots.get(user_id)) is not None and not slot[2]
+        ]
+
     def add_member(self, member: Member | User, role: str, emoji: PartialEmoji) -> None:
+        if (index := self.schema.indexes.get(role)) is None:
+            # The group has no such role, leave the member where they are.
+            return
+
+        if (slot := self._slots.get(member.id)) is not None and slot[0] == index:
+            # Same role, another class: keep the place in the list or queue.
+            slot[1].role = str(emoji)
+            self._dirty.add(index)
+            return
+
         user_data = self.pop_member(member) or _GroupUser(
             id=member.id,
             role=str(emoji),
@@ -256,59 +523,74 @@ class GroupEmbedController:
 
         user_data.role = str(emoji)
 
-        if role == "dps":
-            self.data.dps_members.append(user_data)
-        elif role == "healer":
-            self.data.healer_members.append(user_data)
-        elif role == "tank":
-            self.data.tank_members.append(user_data)
-
-        self._embed = None
+        slots = self._roles[index]
+        if user_data.help:
+            slots.helpers[member.id] = user_data
+            self._slots[member.id] = (index, user_data, False)
+        elif self._has_room(index):
+            slots.regular[member.id] = user_data
+            self._slots[member.id] = (index, user_data, False)
+        else:
+            slots.waitlist[member.id] = user_data
+            self._slots[member.id] = (index, user_data, True)
+        self._dirty.add(index)
 
     def pop_member(self, member: Member | User) -> _GroupUser | None:
-        for user_list in [
-            self.data.dps_members,
-            self.data.healer_members,
-            self.data.tank_members,
-        ]:
-            for index, user in enumerate(user_list):
-                if user.id == member.id:
-                    user_list.pop(index)
-                    return user.model_copy(deep=True)
-        return None
+        if (slot := self._slots.pop(member.id, None)) is None:
+            return None
+
+        index, user, waiting = slot
+        role = self._roles[index]
+        if waiting:
+            del role.waitlist[user.id]
+        else:
+            del (role.helpers if user.help else role.regular)[user.id]
+            self._promote(index)
+
+        self._dirty.add(index)
+        return user
 
     def find_member(self, member: Member | User) -> _GroupUser | None:
-        for user_list in [
-            self.data.dps_members,
-            self.data.healer_members,
-            self.data.tank_members,
-        ]:
-            for user in user_list:
-                if user.id == member.id:
-                    return user
-        return None
+        if (slot := self._slots.get(member.id)) is None:
+            return None
+        return slot[1]
+
+    def is_waiting(self, member: Member | User) -> bool:
+        return (slot := self._slots.get(member.id)) is not None and slot[2]
 
     def remove_member(self, member: Member | User) -> None:
-        for user_list in [
-            self.data.dps_members,
-            self.data.healer_members,
-            self.data.tank_members,
-        ]:
-            for index, user in enumerate(user_list):
-                if user.id == member.id:
-                    user_list.pop(index)
-                    self._embed = None
-                    return
+        self.pop_member(member)
 
     def toggle_help(self, member: Member | User) -> bool | None:
-        for user in (
-            self.data.dps_members + self.data.healer_members + self.data.tank_members
-        ):
-            if user.id == member.id:
-                user.help = not user.help
-                self._embed = None
-                return user.help
-        return None
+        if (slot := self._slots.get(member.id)) is None:
+            return None
+
+        index, user, waiting = slot
+        role = self._roles[index]
+        user.help = not user.help
+
+        if waiting:
+            # Helpers do not need a slot, so they never wait.
+            del role.waitlist[user.id]
+            role.helpers[user.id] = user
+            self._slots[member.id] = (index, user, False)
+        elif user.help:
+            # Either way the member lands between the others and the helpers.
+            del role.regular[user.id]
+            role.helpers[user.id] = user
+            role.helpers.move_to_end(user.id, last=False)
+            self._promote(index)
+        elif self._has_room(index):
+            del role.helpers[user.id]
+            role.regular[user.id] = user
+        else:
+            # No slot is free for them anymore, so they wait like a new member.
+            del role.helpers[user.id]
+            role.waitlist[user.id] = user
+            self._slots[member.id] = (index, user, True)
+
+        self._dirty.add(index)
+        return user.help
 
     def set_imagine(
         self,
@@ -317,49 +599,60 @@ class GroupEmbedController:
         tina: int | None = None,
         basilisk: int | None = None,
     ) -> None:
-        for users_list in [
-            self.data.dps_members,
-            self.data.healer_members,
-            self.data.tank_members,
-        ]:
-            for user in users_list:
-                if user.id == member.id:
-                    user.airona = airona
-                    user.tina = tina
-                    user.basilisk = basilisk
-                    self._embed = None
-                    return
-
-    def generate_list(self, caller: User | Member | None = None) -> str:
-        lines: list[str] = []
-
-        for role_name, members, limit in [
-            ("Damage", self.data.dps_members, self.data.dps_limit),
-            ("Support", self.data.healer_members, self.data.healer_limit),
-            ("Tank", self.data.tank_members, self.data.tank_limit),
-        ]:
-            title = (
-                f"{role_name} ({len(members)}"
-                f"{f'/{int(limit)}' if limit != float('inf') else ''}):"
+        if (slot := self._slots.get(member.id)) is None:
+            return
+
+        index, user, _ = slot
+        user.airona = airona
+        user.tina = tina
+        user.basilisk = basilisk
+        self._dirty.add(index)
+
+    def generate_list(self, caller: User | Member | None = None) -> list[str]:
+        """Render the team call, split into messages Discord accepts."""
+        lines: list[str] = [
+            f"-# <@{caller.id if caller else self.data.owner.id}> is calling for team members to join",  # noqa: E501
+            "",
+            f"**{self.data.name}** - {format_dt(self.data.time, style='R')}",
+            f"{self.data.desc}",
+        ]
+
+        for index, (role, slots, limit) in enumerate(
+            zip(self.schema.roles, self._roles, self.data.limits, strict=True),
+        ):
+            members = slots.members()
+            waitlist = slots.waitlist.values()
+            if index:
+                lines.append("")
+
+            lines.append(
+                f"{role.label} ({len(members)}"
+                f"{f'/{int(limit)}' if limit != float('inf') else ''}):",
             )
-            member_list: list[str] = []
             if not members:
-                member_list.append("(none)")
+                lines.append("(none)")
             else:
-                for index, member in enumerate(members):
-                    member_list.append(
-                        f"{index + 1}. {member.role} <@{member.id}> "
-                        f"{'' if (member.airona is None) else f'Airona {member.airona}★'} "  # noqa: E501
-                        f"{'' if (member.tina is None) else f'Tina {member.tina}★'} "
-                        f"{'' if (member.basilisk is None) else f'Basilisk {member.basilisk}★'} "  # noqa: E501
-                        f"{LukEmojis.lukchan_wow if member.help else ''}",
-                    )
-            lines.append(f"{title}\n" + "\n".join(member_list))
+                lines.extend(
+                    self._list_line(index, member)
+                    for index, member in enumerate(members)
+                )
+
+            if waitlist:
+                lines.append("Waitlist:")
+                lines.extend(
+                    self._list_line(index, member)
+                    for index, member in enumerate(waitlist)
+                )
+
+        return [chunk.strip() for chunk in chunk_lines(lines, _MESSAGE_CHARS)]
 
+    def _list_line(self, index: int, member: _GroupUser) -> str:
         return (
-            f"-# <@{caller.id if caller else self.data.owner.id}> is calling for team members to join\n\n"  # noqa: E501
-            f"**{self.data.name}** - {format_dt(self.data.time, style='R')}\n"
-            f"{self.data.desc}\n" + "\n\n".join(lines).strip()
+            f"{index + 1}. {member.role} <@{member.id}> "
+            f"{'' if (member.airona is None) else f'Airona {member.airona}★'} "
+            f"{'' if (member.tina is None) else f'Tina {member.tina}★'} "
+            f"{'' if (member.basilisk is None) else f'Basilisk {member.basilisk}★'} "
+            f"{LukEmojis.lukchan_wow if member.help else ''}"
         )
 
     def generate_call_message(self) -> list[Embed]:
@@ -0,0 +1,271 @@
+import asyncio
+import contextlib
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from logging import getLogger
+from time import perf_counter
+from typing import Self
+
+from discord import (
+    Forbidden,
+    Guild,
+    HTTPException,
+    Message,
+    Object,
+    TextChannel,
+    Thread,
+    utils,
+)
+
+from src._settings import config
+from src.db._leaderboard_buffer import LeaderboardDeltas
+from src.db.leaderboard import LeaderboardDatabase
+
+_logger = getLogger("luk.leaderboard.backfill")
+
+type _HistoryChannel = TextChannel | Thread
+
+
+def countable_content(message: Message) -> str | None:
+    """Get the text a message contributes to the leaderboard.
+
+    Args:
+        message (Message): The message to check.
+
+    Returns:
+        str | None: The cleaned content, or None if the message does not count.
+    """
+    if message.author.bot or (
+        not message.content
+        or message.content.isspace()
+        or message.content.startswith(("!", "/", "?"))
+        or len(message.content) < config.MIN_MESSAGE_LENGTH
+    ):
+        return None
+
+    return utils.remove_markdown(message.clean_content).strip()
+
+
+@dataclass(slots=True)
+class BackfillProgress:
+    channels_total: int = 0
+    channels_done: int = 0
+    messages_scanned: int = 0
+    messages_counted: int = 0
+    users: set[str] = field(default_factory=set)
+    started: float = field(default_factory=perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return perf_counter() - self.started
+
+    def summary(self) -> str:
+        return (
+            f"Channels synced: {self.channels_done}/{self.channels_total}\n"
+            f"Messages scanned: {self.messages_scanned:,}\n"
+            f"Messages counted: {self.messages_counted:,}\n"
+            f"Users synced: {len(self.users):,}\n"
+            f"Elapsed: {self.elapsed:.0f}s"
+        )
+
+
+class LeaderboardBackfill:
+    """Rebuilds leaderboard counters from channel history.
+
+    Channels and threads are scanned oldest-first by a bounded number of
+    concurrent workers; discord.py already waits out per-route rate limits.
+    Only the gaps in each channel's message coverage are fetched. Counts are
+    aggregated in memory and written as bulk upserts every `batch_size`
+    messages, extending the coverage so an interrupted or repeated run
+    resumes where it stopped without counting anything twice.
+    """
+
+    __instance: Self | None = None
+
+    def __new__(cls) -> Self:
+        if cls.__instance is None:
+            cls.__instance = super().__new__(cls)
+
+        return cls.__instance
+
+    def __init__(self) -> None:
+        if hasattr(self, "_db"):
+            return
+
+        self._db = LeaderboardDatabase()
+        self._concurrency = config.LEADERBOARD_BACKFILL_CONCURRENCY
+        self._batch_size = config.LEADERBOARD_BACKFILL_BATCH_SIZE
+        self._lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    async def run(
+        self,
+        guild: Guild,
+        on_progress: Callable[[BackfillProgress], Awaitable[None]] | None = None,
+        *,
+        interval: float = 5.0,
+    ) -> BackfillProgress:
+        """Backfill every coverage gap of every readable channel and thread.
+
+        Counters kept before coverage tracking are reset first, the whole
+        history is counted again instead.
+        """
+        async with self._lock:
+            if await self._db.recount_required():
+                await self._db.reset_counts()
+
+            channels = await self._collect_channels(guild)
+            progress = await self._scan_channels(
+                channels,
+                self._db.coverage.gaps,
+                on_progress,
+                interval,
+            )
+
+            _logger.info("Leaderboard backfill finished\n%s", progress.summary())
+            return progress
+
+    async def catch_up(self, guild: Guild) -> BackfillProgress | None:
+        """Count the messages missed since the previous gateway session.
+
+        Only channels that already have coverage are visited, and only the
+        history after where they stood when the session started is fetched.
+        """
+        if self.running:
+            # The running backfill will reach the same gaps.
+            return None
+
+        async with self._lock:
+            coverage = self._db.coverage
+            channels = [
+                channel
+                for channel_id in coverage.session_marks
+                if isinstance(
+                    channel := guild.get_channel_or_thread(channel_id),
+                    (TextChannel, Thread),
+                )
+                and channel.permissions_for(guild.me).read_message_history
+            ]
+            progress = await self._scan_channels(channels, coverage.gaps_since_mark)
+
+            _logger.info("Leaderboard catch-up finished\n%s", progress.summary())
+            return progress
+
+    async def _scan_channels(
+        self,
+        channels: list[_HistoryChannel],
+        gaps: Callable[[int], list[tuple[int, int | None]]],
+        on_progress: Callable[[BackfillProgress], Awaitable[None]] | None = None,
+        interval: float = 5.0,
+    ) -> BackfillProgress:
+        progress = BackfillProgress(channels_total=len(channels))
+        semaphore = asyncio.Semaphore(self._concurrency)
+
+        async def scan(channel: _HistoryChannel) -> None:
+            async with semaphore:
+                try:
+                    for start, end in gaps(channel.id):
+                        await self._scan_gap(channel, start, end, progress)
+                except HTTPException:
+                    _logger.exception("Failed to backfill %s", channel)
+                progress.channels_done += 1
+
+        reporter = (
+            asyncio.create_task(self._report(progress, on_progress, interval))
+            if on_progress
+            else None
+        )
+        try:
+            await asyncio.gather(*(scan(channel) for channel in channels))
+        finally:
+            if reporter:
+                reporter.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await reporter
+
+        return progress
+
+    async def _collect_channels(self, guild: Guild) -> list[_HistoryChannel]:
+        channels: dict[int, _HistoryChannel] = {
+            channel.id: channel for channel in guild.text_channels
+        }
+
+        for thread in await guild.active_threads():
+            channels[thread.id] = thread
+
+        for parent in [*guild.text_channels, *guild.forums]:
+            try:
+                async for thread in parent.archived_threads(limit=None):
+                    channels[thread.id] = thread
+            except Forbidden:
+                continue
+
+        return [
+            channel
+            for channel in channels.values()
+            if channel.permissions_for(guild.me).read_message_history
+        ]
+
+    async def _scan_gap(
+        self,
+        channel: _HistoryChannel,
+        start: int,
+        end: int | None,
+        progress: BackfillProgress,
+    ) -> None:
+        pending = LeaderboardDeltas()
+        last_id: int | None = None
+        batch = 0
+
+        async for message in channel.history(
+            limit=None,
+            oldest_first=True,
+            after=Object(start - 1) if start else None,
+        ):
+            # `before` would only filter, the history would still be paged to
+            # the newest message, so stop at the end of the gap manually.
+            if end is not None and message.id > end:
+                break
+
+            last_id = message.id
+            batch += 1
+            progress.messages_scanned += 1
+
+            if self._db.coverage.contains(channel.id, message.id):
+                # Already counted live while this gap was being scanned.
+                continue
+
+            if (content := countable_content(message)) is not None:
+                user_id = str(message.author.id)
+                pending.add(user_id, len(content), message.created_at)
+                progress.messages_counted += 1
+                progress.users.add(user_id)
+
+            if batch >= self._batch_size:
+                await self._db.commit_backfill(channel.id, pending, start, last_id)
+                pending = LeaderboardDeltas()
+                batch = 0
+
+        # A closed gap has been read in full, an open one up to its newest message.
+        if end is not None:
+            await self._db.commit_backfill(channel.id, pending, start, end)
+        elif last_id is not None:
+            await self._db.commit_backfill(channel.id, pending, start, last_id)
+
+    async def _report(
+        self,
+        progress: BackfillProgress,
+        on_progress: Callable[[BackfillProgress], Awaitable[None]],
+        interval: float,
+    ) -> None:
+        while True:
+            await asyncio.sleep(interval)
+
+            try:
+                await on_progress(progress)
+            except HTTPException:
+                _logger.warning("Stopped reporting backfill progress", exc_info=True)
+                return
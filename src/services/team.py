@@ -0,0 +1,281 @@
+import asyncio
+import contextlib
+import heapq
+import time
+from datetime import UTC, datetime
+from logging import getLogger
+from typing import Self
+
+from discord import (
+    AllowedMentions,
+    Client,
+    Embed,
+    HTTPException,
+    Member,
+    NotFound,
+    TextChannel,
+    Thread,
+    User,
+)
+from pymongo.errors import PyMongoError
+
+from src._colors import LukColors
+from src._settings import config
+from src.db.team import TeamGroupDatabase
+from src.embeds.team.group_controller import GroupEmbedController
+
+_logger = getLogger("luk.team")
+
+# Pause between sweeper batches, leaving the rate limits to everything else.
+_SWEEP_BATCH_PAUSE = 5.0
+
+
+def closed_notice(closed_by: Member | User | None = None) -> Embed:
+    """Build the notice posted in the thread of a closed group.
+
+    Args:
+        closed_by (Member | User | None): Who closed the group, None if it
+            was closed automatically.
+
+    Returns:
+        Embed: The notice.
+    """
+    embed = Embed(
+        description="This team has been closed and is no longer active.",
+        colour=LukColors.primary_blue,
+    )
+    if closed_by is not None:
+        embed.set_author(name=closed_by.name, icon_url=closed_by.display_avatar.url)
+    return embed
+
+
+async def _get_thread(client: Client, message_id: int) -> Thread | None:
+    # The thread of a group shares the ID of the group message.
+    thread = client.get_channel(message_id)
+    if thread is None:
+        thread = await client.fetch_channel(message_id)
+
+    return thread if isinstance(thread, Thread) else None
+
+
+class TeamReminders:
+    """Posts the team call of every group in its thread when the group starts.
+
+    Upcoming groups are loaded once into a min-heap of start times, and a
+    single task sleeps until the earliest one. Rescheduling pushes a new
+    entry and leaves the old one to be skipped when it surfaces, so it costs
+    O(log n) and no group needs a task of its own.
+    """
+
+    __instance: Self | None = None
+
+    def __new__(cls) -> Self:
+        if cls.__instance is None:
+            cls.__instance = super().__new__(cls)
+
+        return cls.__instance
+
+    def __init__(self) -> None:
+        if hasattr(self, "_heap"):
+            return
+
+        self._heap: list[tuple[float, int]] = []
+        # The current deadline of every scheduled group, heap entries that
+        # disagree with it are stale.
+        self._deadlines: dict[int, float] = {}
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self._client: Client | None = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._deadlines)
+
+    async def start(self, client: Client) -> None:
+        if self._task is not None and not self._task.done():
+            return
+
+        self._client = client
+
+        # Reminders missed while offline are still sent within the grace time.
+        cutoff = datetime.fromtimestamp(time.time() - config.TEAM_REMINDER_GRACE, UTC)
+        for document in await TeamGroupDatabase().upcoming_reminders(cutoff):
+            self._push(document["message_id"], document["remind_at"].timestamp())
+
+        self._task = asyncio.create_task(self._run(), name="team-reminders")
+        self._task.add_done_callback(self._log_stop)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def schedule(self, message_id: int, at: datetime) -> None:
+        """Remind a group at `at`, replacing its previous reminder."""
+        await TeamGroupDatabase().set_reminder(message_id, at.astimezone(UTC))
+        self._push(message_id, at.timestamp())
+
+    def cancel(self, message_id: int) -> None:
+        self._deadlines.pop(message_id, None)
+
+    @staticmethod
+    def _log_stop(task: asyncio.Task[None]) -> None:
+        # Every group's reminders hang on this one task.
+        if not task.cancelled() and (exc := task.exception()) is not None:
+            _logger.error("Team reminders stopped", exc_info=exc)
+
+    def _push(self, message_id: int, deadline: float) -> None:
+        self._deadlines[message_id] = deadline
+        heapq.heappush(self._heap, (deadline, message_id))
+
+        if self._heap[0] == (deadline, message_id):
+            # Earlier than what the timer sleeps for.
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        if self._client is not None:
+            await self._client.wait_until_ready()
+
+        while True:
+            while self._heap and (
+                self._deadlines.get(self._heap[0][1]) != self._heap[0][0]
+            ):
+                heapq.heappop(self._heap)
+
+            delay = self._heap[0][0] - time.time() if self._heap else None
+            if delay is None or delay > 0:
+                self._wakeup.clear()
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                continue
+
+            _, message_id = heapq.heappop(self._heap)
+            del self._deadlines[message_id]
+            await self._remind(message_id)
+
+    async def _remind(self, message_id: int) -> None:
+        if self._client is None:
+            return
+
+        try:
+            controller = await GroupEmbedController.get(message_id)
+
+            if (thread := await _get_thread(self._client, message_id)) is None:
+                _logger.warning("Team group %s has no thread", message_id)
+            else:
+                for content in controller.generate_list():
+                    await thread.send(
+                        content=content,
+                        allowed_mentions=AllowedMentions.all(),
+                    )
+
+            await TeamGroupDatabase().clear_reminder(message_id)
+        except ValueError:
+            _logger.debug("Team group %s was closed before its reminder", message_id)
+        except Exception:
+            # One broken group must not stop the reminders of the others.
+            _logger.exception("Failed to remind team group %s", message_id)
+
+
+class TeamGroupSweeper:
+    """Closes the groups whose start is `TEAM_CLOSE_GRACE` seconds past.
+
+    Expired groups are found through the start time index of the team group
+    store. Each one loses its buttons, gets the close notice in its thread
+    and has the thread archived, a batch at a time with a pause in between.
+    """
+
+    __instance: Self | None = None
+
+    def __new__(cls) -> Self:
+        if cls.__instance is None:
+            cls.__instance = super().__new__(cls)
+
+        return cls.__instance
+
+    def __init__(self) -> None:
+        if hasattr(self, "_task"):
+            return
+
+        self._task: asyncio.Task[None] | None = None
+        self._client: Client | None = None
+
+        self.closed = 0
+
+    def start(self, client: Client) -> None:
+        self._client = client
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="team-sweeper")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self) -> None:
+        if self._client is not None:
+            await self._client.wait_until_ready()
+
+        while True:
+            try:
+                if count := await self.sweep():
+                    _logger.info("Closed %s expired team groups", count)
+            except PyMongoError:
+                _logger.exception("Failed to sweep expired team groups")
+
+            await asyncio.sleep(config.TEAM_SWEEP_INTERVAL)
+
+    async def sweep(self) -> int:
+        """Close every expired group.
+
+        Returns:
+            int: The number of groups closed.
+        """
+        if self._client is None:
+            return 0
+
+        channel = self._client.get_channel(config.BPSR_GROUP_CHANNEL_ID)
+        if not isinstance(channel, TextChannel):
+            _logger.warning("Could not find the team group channel")
+            return 0
+
+        cutoff = datetime.fromtimestamp(time.time() - config.TEAM_CLOSE_GRACE, UTC)
+        count = 0
+
+        while message_ids := await TeamGroupDatabase().started_before(
+            cutoff,
+            config.TEAM_SWEEP_BATCH_SIZE,
+        ):
+            for message_id in message_ids:
+                await self._close(channel, message_id)
+            count += len(message_ids)
+
+            if len(message_ids) < config.TEAM_SWEEP_BATCH_SIZE:
+                break
+            await asyncio.sleep(_SWEEP_BATCH_PAUSE)
+
+        self.closed += count
+        return count
+
+    async def _close(self, channel: TextChannel, message_id: int) -> None:
+        if self._client is None:
+            return
+
+        try:
+            await channel.get_partial_message(message_id).edit(view=None)
+
+            if (thread := await _get_thread(self._client, message_id)) is not None:
+                await thread.send(embed=closed_notice())
+                await thread.edit(archived=True)
+        except NotFound:
+            _logger.debug("Team group %s was already deleted", message_id)
+        except HTTPException:
+            _logger.exception("Failed to close team group %s", message_id)
+
+        # Dropped even if Discord refused, or it would be retried forever.
+        await GroupEmbedController.discard(message_id)
+        TeamReminders().cancel(message_id)